@@ -0,0 +1,239 @@
+"""
+Audit trail of every decision, written off the request path.
+
+Requests hand a compact DecisionRecord to a bounded in-memory queue. A background
+thread batches the records into Arrow tables and appends them to Parquet files,
+partitioned by day and rotated by age and size:
+
+    <directory>/date=2026-10-19/part-20261019T143000-<pid>-0001.parquet
+
+A file is written as a hidden `.part-....inprogress` file and renamed when it is
+closed, so readers (pandas, pyarrow datasets) only ever see complete files. The
+process id in the name keeps uvicorn workers sharing a directory apart.
+"""
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# What to do when the queue is full: drop the record, or wait for the writer
+# (up to BLOCK_TIMEOUT_SECONDS, then drop)
+POLICIES = ('drop', 'block')
+BLOCK_TIMEOUT_SECONDS = 1.0
+# Upper bound on how long the writer waits before checking for a stop request
+POLL_SECONDS = 0.25
+
+
+def _json_default(value: Any) -> Any:
+    # Feature values computed with NumPy/pandas arrive as NumPy scalars; keep them numeric
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class DecisionRecord(NamedTuple):
+    timestamp: float # seconds since the epoch
+    transaction_id: int | None # None for transactions not served from the feature store
+    customer_id: int
+    strategy_id: str
+    role: str # 'production' or 'shadow'
+    decision: str
+    is_fraud: bool
+    amount: float
+    model_score: float | None
+    features: Dict[str, Any] # values attached by feature nodes
+    model_input: Dict[str, float] | None # the full vector the model scored, if a model node ran
+    path: List[str] # node ids from the input to the action
+    total_ms: float
+    node_timings_ms: Dict[str, float]
+
+
+DECISION_LOG_SCHEMA = pa.schema([
+    ('timestamp', pa.timestamp('ms', tz='UTC')),
+    ('transaction_id', pa.int64()),
+    ('customer_id', pa.int64()),
+    ('strategy_id', pa.string()),
+    ('role', pa.string()),
+    ('decision', pa.string()),
+    ('is_fraud', pa.bool_()),
+    ('amount', pa.float64()),
+    ('model_score', pa.float64()),
+    ('features', pa.string()), # JSON object; feature sets differ between strategies
+    ('model_input', pa.string()), # JSON object keyed by model feature name, or null
+    ('path', pa.list_(pa.string())),
+    ('total_ms', pa.float64()),
+    ('node_timings_ms', pa.string()), # JSON object keyed by node id
+])
+
+
+class DecisionLog:
+    """A bounded queue of decision records drained into Parquet files by a background thread."""
+
+    def __init__(self, queue_size: int = 10_000, policy: str = 'drop', batch_size: int = 1_000,
+                 flush_seconds: float = 5.0, rotate_seconds: float = 300.0, rotate_rows: int = 500_000):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown decision log policy '{policy}'. Use one of: {', '.join(POLICIES)}")
+        self.queue_size = queue_size
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.rotate_seconds = rotate_seconds
+        self.rotate_rows = rotate_rows
+
+        self.directory: Path | None = None
+        self.dropped = 0
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._dropped_lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        # State of the file being written, owned by the writer thread
+        self._writer: pq.ParquetWriter | None = None
+        self._writer_day: str | None = None
+        self._writer_paths: tuple[Path, Path] | None = None # (in progress, final)
+        self._writer_opened = 0.0
+        self._writer_rows = 0
+
+    @classmethod
+    def from_env(cls) -> 'DecisionLog':
+        """Reads DECISION_LOG_QUEUE_SIZE, _POLICY, _BATCH_SIZE, _FLUSH_SECONDS, _ROTATE_SECONDS and _ROTATE_ROWS."""
+        env = os.environ
+        return cls(
+            queue_size=int(env.get('DECISION_LOG_QUEUE_SIZE', 10_000)),
+            policy=env.get('DECISION_LOG_POLICY', 'drop'),
+            batch_size=int(env.get('DECISION_LOG_BATCH_SIZE', 1_000)),
+            flush_seconds=float(env.get('DECISION_LOG_FLUSH_SECONDS', 5.0)),
+            rotate_seconds=float(env.get('DECISION_LOG_ROTATE_SECONDS', 300.0)),
+            rotate_rows=int(env.get('DECISION_LOG_ROTATE_ROWS', 500_000)),
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, directory: str | Path):
+        """Starts the writer thread. Records submitted before this are ignored."""
+        if self._thread is not None:
+            return
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._write_loop, name='decision-log-writer', daemon=True)
+        self._thread.start()
+        logger.info(f"Decision log writing to {self.directory} (policy: {self.policy}, queue: {self.queue_size}).")
+
+    def stop(self, timeout: float = 10.0):
+        """Writes everything still queued, closes the open file and stops the writer thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Decision log writer did not stop in time; queued records may be lost.")
+        self._thread = None
+        logger.info(f"Decision log stopped: {self.written} records written, {self.dropped} dropped.")
+
+    def submit(self, record: DecisionRecord) -> bool:
+        """Queues a record without waiting on any I/O. Returns False if it was dropped."""
+        if self._thread is None:
+            return False
+        try:
+            if self.policy == 'block':
+                self._queue.put(record, timeout=BLOCK_TIMEOUT_SECONDS)
+            else:
+                self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            return False
+
+    def _write_loop(self):
+        batch: List[DecisionRecord] = []
+        deadline = time.monotonic() + self.flush_seconds
+        reported_dropped = 0
+        while True:
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, min(POLL_SECONDS, deadline - time.monotonic()))))
+            except queue.Empty:
+                pass
+
+            stopping = self._stop.is_set()
+            if stopping:
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            if len(batch) < self.batch_size and time.monotonic() < deadline and not stopping:
+                continue
+
+            if batch:
+                self._write_batch(batch)
+                batch = []
+            deadline = time.monotonic() + self.flush_seconds
+            # Close idle files too, so their records become readable
+            if self._writer is not None and time.time() - self._writer_opened >= self.rotate_seconds:
+                self._close_file()
+            if self.dropped > reported_dropped:
+                logger.warning(f"Decision log queue full: {self.dropped - reported_dropped} records dropped.")
+                reported_dropped = self.dropped
+            if stopping:
+                self._close_file()
+                return
+
+    def _write_batch(self, batch: List[DecisionRecord]):
+        try:
+            # A batch spanning midnight is split so each file stays in its day's partition
+            for day, records in itertools.groupby(batch, key=lambda r: time.strftime('%Y-%m-%d', time.gmtime(r.timestamp))):
+                records = list(records)
+                if self._writer is not None and (day != self._writer_day or self._writer_rows >= self.rotate_rows):
+                    self._close_file()
+                if self._writer is None:
+                    self._open_file(day)
+                self._writer.write_table(self._to_table(records))
+                self._writer_rows += len(records)
+                self.written += len(records)
+        except Exception as e:
+            logger.error(f"Decision log could not write {len(batch)} records: {e}")
+
+    @staticmethod
+    def _to_table(records: List[DecisionRecord]) -> pa.Table:
+        columns = dict(zip(DecisionRecord._fields, map(list, zip(*records))))
+        columns['timestamp'] = [int(t * 1000) for t in columns['timestamp']]
+        columns['features'] = [json.dumps(f, default=_json_default) for f in columns['features']]
+        columns['model_input'] = [None if m is None else json.dumps(m, default=_json_default) for m in columns['model_input']]
+        columns['node_timings_ms'] = [json.dumps(t) for t in columns['node_timings_ms']]
+        return pa.Table.from_pydict(columns, schema=DECISION_LOG_SCHEMA)
+
+    def _open_file(self, day: str):
+        partition = self.directory / f"date={day}"
+        partition.mkdir(parents=True, exist_ok=True)
+        name = f"part-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{os.getpid()}-{next(self._sequence):04d}.parquet"
+        in_progress = partition / f".{name}.inprogress"
+        self._writer = pq.ParquetWriter(in_progress, DECISION_LOG_SCHEMA, compression='zstd')
+        self._writer_day, self._writer_paths = day, (in_progress, partition / name)
+        self._writer_opened, self._writer_rows = time.time(), 0
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        in_progress, final = self._writer_paths
+        try:
+            self._writer.close()
+            os.replace(in_progress, final)
+        except Exception as e:
+            logger.error(f"Decision log could not close {in_progress}: {e}")
+        self._writer = self._writer_day = self._writer_paths = None
@@ -0,0 +1,201 @@
+import json
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .metrics import DEFAULT_WINDOWS, TimeBucketRing
+
+logger = logging.getLogger(__name__)
+
+# Feature name under which the model's output is tracked
+MODEL_SCORE = 'MODEL_SCORE'
+# Keeps PSI finite when a bin is empty on one side
+PSI_EPSILON = 1e-4
+
+# Quantile sketch on a fixed logarithmic grid (as in DDSketch): magnitudes between
+# SKETCH_MIN_MAGNITUDE and SKETCH_MAX_MAGNITUDE fall into buckets whose bounds grow by a
+# factor gamma, so any quantile is known to within SKETCH_RELATIVE_ACCURACY. Smaller
+# magnitudes count as 0 and larger ones are clamped. Sketches are plain counters, so
+# they merge by addition and live in the same time-bucket rings as the histograms.
+SKETCH_RELATIVE_ACCURACY = 0.05
+SKETCH_MIN_MAGNITUDE = 1e-3
+SKETCH_MAX_MAGNITUDE = 1e7
+_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+_SKETCH_BUCKETS_PER_SIGN = math.ceil(math.log(SKETCH_MAX_MAGNITUDE / SKETCH_MIN_MAGNITUDE) / _LOG_GAMMA)
+# Negative buckets (most negative first), the zero bucket, then positive buckets
+SKETCH_WIDTH = 2 * _SKETCH_BUCKETS_PER_SIGN + 1
+
+
+def sketch_params() -> Dict[str, float]:
+    return {'relative_accuracy': SKETCH_RELATIVE_ACCURACY, 'min_magnitude': SKETCH_MIN_MAGNITUDE, 'max_magnitude': SKETCH_MAX_MAGNITUDE}
+
+
+def sketch_index(values: np.ndarray) -> np.ndarray:
+    """Maps values to their sketch buckets, in value order. Bucket k of each sign covers magnitudes (min * gamma^(k-1), min * gamma^k]."""
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.abs(values)
+    with np.errstate(divide='ignore'):
+        k = np.ceil(np.log(np.maximum(magnitude, SKETCH_MIN_MAGNITUDE) / SKETCH_MIN_MAGNITUDE) / _LOG_GAMMA)
+    k = np.where(magnitude < SKETCH_MIN_MAGNITUDE, 0, np.clip(k, 1, _SKETCH_BUCKETS_PER_SIGN)).astype(np.int64)
+    return _SKETCH_BUCKETS_PER_SIGN + np.where(values < 0, -k, k)
+
+
+def sketch_quantile(counts: np.ndarray, q: float) -> float | None:
+    """Estimates a quantile from sketch counts, returning the bucket's value with the smallest relative error."""
+    total = counts.sum()
+    if total == 0:
+        return None
+    index = int(np.searchsorted(np.cumsum(counts), q * (total - 1), side='right'))
+    k = index - _SKETCH_BUCKETS_PER_SIGN
+    if k == 0:
+        return 0.0
+    value = 2 * SKETCH_MIN_MAGNITUDE * _GAMMA ** abs(k) / (_GAMMA + 1)
+    return float(math.copysign(value, k))
+
+
+def histogram_quantile(edges: np.ndarray, counts: np.ndarray, q: float) -> float:
+    """
+    Estimates a quantile from binned counts by linear interpolation inside the bin
+    where the cumulative count crosses `q`. The open-ended outer bins return their
+    inner edge.
+    """
+    total = counts.sum()
+    if total == 0 or len(edges) == 0:
+        return float('nan')
+    cdf = np.cumsum(counts) / total
+    b = int(np.searchsorted(cdf, q))
+    if b == 0:
+        return float(edges[0])
+    if b >= len(edges):
+        return float(edges[-1])
+    below = cdf[b - 1]
+    fraction = (q - below) / (cdf[b] - below) if cdf[b] > below else 0.0
+    return float(edges[b - 1] + fraction * (edges[b] - edges[b - 1]))
+
+
+class DriftMonitor:
+    """
+    A singleton service tracking the distribution of the features the model is served.
+
+    Each feature is summarised by a histogram over the bin edges of its reference
+    sketch (computed on the training data by the ML pipeline), used for PSI, and by a
+    quantile sketch, used for quantiles and KS, both kept in time-bucketed rings per
+    window. Memory is fixed by the number of bins, sketch buckets and windows, whatever
+    the traffic, and each observation is one binary search and one log per feature.
+    """
+    _features: List[str] = []
+    _edges: Dict[str, np.ndarray] = {}
+    _reference: Dict[str, np.ndarray] = {} # reference proportions per bin
+    _reference_sketches: Dict[str, np.ndarray] = {} # reference counts on the sketch grid, if the sketch has them
+    _reference_quantiles: Dict[str, Dict[str, float]] = {}
+    _offsets: Dict[str, int] = {} # start of each feature's bins in the counter vector
+    _sketch_offsets: Dict[str, int] = {} # start of each feature's sketch buckets in the counter vector
+    _rings: Dict[str, TimeBucketRing] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def load_reference(cls, sketch_path: str):
+        """Loads the reference sketch saved by the training pipeline."""
+        try:
+            logger.info(f"Loading reference sketch from {sketch_path}...")
+            with open(sketch_path) as f:
+                sketch = json.load(f)
+            cls.configure(sketch)
+            logger.info(f"Reference sketch loaded for {len(cls._features)} features.")
+        except FileNotFoundError:
+            logger.error(f"Reference sketch not found at {sketch_path}. Drift monitoring is disabled.")
+        except Exception as e:
+            logger.error(f"An error occurred loading the reference sketch: {e}")
+
+    @classmethod
+    def configure(cls, sketch: Dict[str, Any]):
+        """Sets up the histograms from a reference sketch and clears all observations."""
+        features, edges, reference, offsets = [], {}, {}, {}
+        reference_sketches, reference_quantiles, sketch_offsets = {}, {}, {}
+        # Reference sketches built on a different grid cannot be compared bucket by bucket
+        same_grid = sketch.get('sketch_params') == sketch_params()
+        width = 0
+        for name, feature in sketch['features'].items():
+            features.append(name)
+            edges[name] = np.asarray(feature['edges'], dtype=np.float64)
+            reference[name] = np.asarray(feature['proportions'], dtype=np.float64)
+            offsets[name] = width
+            width += len(edges[name]) + 1
+            if same_grid and 'sketch' in feature:
+                counts = np.zeros(SKETCH_WIDTH, dtype=np.float64)
+                index, count = np.asarray(feature['sketch'], dtype=np.int64).reshape(-1, 2).T
+                counts[index] = count
+                reference_sketches[name] = counts / max(counts.sum(), 1)
+            if 'quantiles' in feature:
+                reference_quantiles[name] = feature['quantiles']
+        for name in features:
+            sketch_offsets[name] = width
+            width += SKETCH_WIDTH
+
+        with cls._lock:
+            cls._features, cls._edges, cls._reference, cls._offsets = features, edges, reference, offsets
+            cls._reference_sketches, cls._reference_quantiles, cls._sketch_offsets = reference_sketches, reference_quantiles, sketch_offsets
+            cls._rings = {name: TimeBucketRing(length, bucket, width) for name, (length, bucket) in DEFAULT_WINDOWS.items()}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(cls._features)
+
+    @classmethod
+    def observe(cls, values: Dict[str, float], now: float | None = None):
+        """Adds one served feature vector. Features without a reference are ignored."""
+        if not cls._features:
+            return
+        now = time.time() if now is None else now
+        served = np.fromiter((float(values.get(name) or 0.0) for name in cls._features), dtype=np.float64, count=len(cls._features))
+        bins = np.fromiter(
+            (cls._offsets[name] + np.searchsorted(cls._edges[name], value, side='right') for name, value in zip(cls._features, served)),
+            dtype=np.int64, count=len(cls._features)
+        )
+        buckets = np.fromiter((cls._sketch_offsets[name] for name in cls._features), dtype=np.int64, count=len(cls._features))
+        indices = np.concatenate([bins, buckets + sketch_index(served)])
+        with cls._lock:
+            for ring in cls._rings.values():
+                ring.add(now, indices)
+
+    @classmethod
+    def report(cls, window: str, now: float | None = None) -> Dict[str, Any]:
+        """Returns PSI, KS and quantile estimates per feature for a window. Raises KeyError for an unknown window."""
+        if not cls._features:
+            raise RuntimeError("Reference sketch has not been loaded.")
+        now = time.time() if now is None else now
+        ring = cls._rings[window]
+        with cls._lock:
+            counts = ring.totals(now)
+
+        features = []
+        for name in cls._features:
+            edges, expected = cls._edges[name], cls._reference[name]
+            observed_counts = counts[cls._offsets[name]:cls._offsets[name] + len(edges) + 1]
+            observed_sketch = counts[cls._sketch_offsets[name]:cls._sketch_offsets[name] + SKETCH_WIDTH]
+            total = int(observed_counts.sum())
+            # Older reference files carry no exact quantiles; fall back to interpolating their bins
+            quantiles = cls._reference_quantiles.get(name) or {
+                'p50': histogram_quantile(edges, expected, 0.5), 'p95': histogram_quantile(edges, expected, 0.95)}
+            entry = {"feature": name, "observed": total, "psi": None, "ks": None,
+                     "p50": None, "p95": None,
+                     "reference_p50": quantiles['p50'], "reference_p95": quantiles['p95']}
+            if total > 0:
+                actual = observed_counts / total
+                a, e = np.maximum(actual, PSI_EPSILON), np.maximum(expected, PSI_EPSILON)
+                entry["psi"] = float(np.sum((a - e) * np.log(a / e)))
+                reference_sketch = cls._reference_sketches.get(name)
+                if reference_sketch is not None:
+                    entry["ks"] = float(np.max(np.abs(np.cumsum(observed_sketch / total) - np.cumsum(reference_sketch))))
+                else:
+                    entry["ks"] = float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+                entry["p50"] = sketch_quantile(observed_sketch, 0.5)
+                entry["p95"] = sketch_quantile(observed_sketch, 0.95)
+            features.append(entry)
+
+        return {"window": window, "window_seconds": ring.n_buckets * ring.bucket_seconds, "features": features}
@@ -1,25 +1,68 @@
+import inspect
 import logging
-from collections import deque
+import threading
+import time
+from collections import OrderedDict, deque
 from typing import Dict, List, Any, Tuple
-from .schemas import StrategyBlueprint, Transaction, Node, ExecutionTrace, ExecutionStep
+from .schemas import StrategyBlueprint, Transaction, Node, ExecutionTrace, ExecutionStep, MultiExecutionTrace
 from .logic.registry import NODE_LOGIC_REGISTRY
-from google.cloud import firestore
-from google.cloud.firestore_v1.base_query import FieldFilter
+from .metrics import WindowedMetrics
+from .decision_log import DecisionLog, DecisionRecord
 
 logger = logging.getLogger(__name__)
 
-# init firestore
-db = firestore.Client()
-METRICS_DOC_REF = db.collection('simulation_metrics').document('singleton')
+# Firestore is created on first use rather than at import time: importing and
+# authenticating the client is slow, and tests or local runs can inject their own.
+_firestore_client: Any = None
+_metrics_doc_ref: Any = None
+_firestore_lock = threading.Lock()
+
+def set_firestore_client(client: Any):
+    """Injects the Firestore client used for persistent metrics (e.g. a local stand-in)."""
+    global _firestore_client, _metrics_doc_ref
+    with _firestore_lock:
+        _firestore_client = client
+        _metrics_doc_ref = None
+
+def get_metrics_doc_ref() -> Any:
+    """Returns the metrics document, creating the Firestore client on first use."""
+    global _firestore_client, _metrics_doc_ref
+    if _metrics_doc_ref is None:
+        with _firestore_lock:
+            if _firestore_client is None:
+                from google.cloud import firestore
+                _firestore_client = firestore.Client()
+            if _metrics_doc_ref is None:
+                _metrics_doc_ref = _firestore_client.collection('simulation_metrics').document('singleton')
+    return _metrics_doc_ref
+
+# Node types whose results depend only on the transaction they see, so identical
+# nodes in different blueprints can share one computation per transaction.
+SHAREABLE_NODE_TYPES = ('Feature', 'Model')
+# Results of shareable nodes keyed by their inputs: (handle, output data, features added, model score, model input)
+SharedResults = Dict[Tuple, Tuple[str | None, dict, Dict[str, Any], float | None, Dict[str, float] | None]]
+# Upper bound on the number of shadow metrics streams kept, to keep metrics memory bounded.
+# Beyond it the least recently used stream is evicted; it is also the limit per request.
+MAX_SHADOW_STRATEGIES = 16
+# Strategy id logged for /strategy/execute requests that do not name their strategy
+PRODUCTION_STRATEGY_ID = 'production'
 
 class ExecutionEngine:
 
     def __init__(self):
+        # In-process sliding-window metrics, served by /simulation/metrics
+        self.window_metrics = WindowedMetrics()
+        # Ordered by last use, so the least recently used stream is evicted first
+        self.shadow_metrics: OrderedDict[str, WindowedMetrics] = OrderedDict()
+        self._shadow_lock = threading.Lock()
+        # Audit trail of every decision; started by the application on startup
+        self.decision_log = DecisionLog.from_env()
+        self.warm_up_failures: List[str] = []
         logger.info("ExecutionEngine initialized (using Firestore for state)")
 
     def _get_metrics(self) -> Dict[str, int]:
         """Loads metrics from Firestore. Returns defaults if document doesn't exist."""
-        doc = METRICS_DOC_REF.get()
+        doc = get_metrics_doc_ref().get()
         if not doc.exists:
             return {"true_positives": 0, "false_positives": 0, "false_negatives": 0}
         return doc.to_dict()
@@ -27,11 +70,13 @@ class ExecutionEngine:
     def reset(self):
         """Resets the metrics in Firestore to zero."""
         logger.info("Resetting persistent metrics in Firestore.")
-        METRICS_DOC_REF.set({
+        get_metrics_doc_ref().set({
             "true_positives": 0,
             "false_positives": 0,
             "false_negatives": 0
         })
+        self.window_metrics.reset()
+        self.shadow_metrics.clear()
 
     def _calculate_metrics(self, metrics: Dict[str, int]) -> Tuple[float, float]:
         """Calculates precision and recall from the current metrics."""
@@ -44,10 +89,139 @@ class ExecutionEngine:
 
         return precision, recall
 
-    def execute(self, blueprint: StrategyBlueprint, transaction: Transaction) -> ExecutionTrace:
+    def warm_up(self, customer_id: int = 0) -> Dict[str, float]:
+        """
+        Runs a synthetic transaction through every registered node so the first real
+        request does not pay for first-call costs (model predict, pandas code paths).
+        Nothing is recorded in the metrics. Returns the time taken per node in ms;
+        nodes that raised unexpectedly are listed in `warm_up_failures`.
+        """
+        timings: Dict[str, float] = {}
+        self.warm_up_failures = []
+        for label, logic_function in NODE_LOGIC_REGISTRY.items():
+            node = Node(id=f"warm-up-{label}", type="warmUp", data={"label": label}, position={"x": 0, "y": 0})
+            transaction = Transaction(id=customer_id, amount=100.0, isFraud=False)
+            kwargs = {}
+            if 'parent_results' in inspect.signature(logic_function).parameters:
+                kwargs['parent_results'] = {"warm-up": True}
+
+            started = time.perf_counter()
+            try:
+                logic_function(node, transaction, **kwargs)
+            except ValueError as e:
+                # Nodes that need user configuration (e.g. an expression) cannot run on synthetic input
+                logger.info(f"Warm-up of node '{label}' skipped: {e}")
+            except Exception as e:
+                logger.warning(f"Warm-up of node '{label}' failed: {e}")
+                self.warm_up_failures.append(label)
+            timings[label] = (time.perf_counter() - started) * 1000
+
+        # Create the Firestore client now so the first decision does not pay for it
+        started = time.perf_counter()
+        try:
+            from google.cloud.firestore_v1.transforms import Increment  # noqa: F401
+            get_metrics_doc_ref()
+        except Exception as e:
+            logger.warning(f"Warm-up of the Firestore client failed: {e}")
+            self.warm_up_failures.append('Firestore')
+        timings['Firestore'] = (time.perf_counter() - started) * 1000
+
+        logger.info(f"Warm-up finished in {sum(timings.values()):.1f} ms")
+        return timings
+
+    def execute(self, blueprint: StrategyBlueprint, transaction: Transaction,
+                strategy_id: str = PRODUCTION_STRATEGY_ID) -> ExecutionTrace:
+        """
+        Executes a single (production) strategy and updates the persistent metrics.
+        """
+        started = time.perf_counter()
+        node_timings: Dict[str, float] = {}
+        decision, path, node_outputs = self._run(blueprint, transaction, node_timings=node_timings)
+        self._log_decision(strategy_id, 'production', decision, path, transaction, started, node_timings)
+        return self._record_production(decision, path, node_outputs, transaction)
+
+    def execute_many(self, strategies: Dict[str, StrategyBlueprint], transaction: Transaction, champion: str) -> MultiExecutionTrace:
+        """
+        Executes a champion strategy and any number of shadow (challenger) strategies
+        on the same transaction. Feature and model nodes that see identical inputs are
+        computed once and shared across all strategies, so a shadow strategy reusing
+        the champion's features and model adds almost no cost.
+
+        Only the champion updates the persistent metrics; every shadow strategy gets
+        its own sliding-window metrics stream. The champion runs first and its errors
+        fail the request; a failing shadow strategy is reported in `failed` and never
+        affects the champion's decision.
+        """
+        if champion not in strategies:
+            raise ValueError(f"Champion strategy '{champion}' is not among the submitted strategies.")
+        shadow_ids = [strategy_id for strategy_id in strategies if strategy_id != champion]
+        if len(shadow_ids) > MAX_SHADOW_STRATEGIES:
+            raise ValueError(f"At most {MAX_SHADOW_STRATEGIES} shadow strategies can run in one request.")
+
+        shared_results: SharedResults = {}
+        result = MultiExecutionTrace(champion=champion, traces={})
+        for strategy_id in [champion] + shadow_ids:
+            # Logic functions annotate the transaction, so each strategy works on its own copy
+            strategy_transaction = transaction.model_copy(deep=True)
+            started = time.perf_counter()
+            node_timings: Dict[str, float] = {}
+            if strategy_id == champion:
+                decision, path, node_outputs = self._run(strategies[strategy_id], strategy_transaction, shared_results, node_timings)
+                self._log_decision(strategy_id, 'production', decision, path, strategy_transaction, started, node_timings)
+                result.traces[strategy_id] = self._record_production(decision, path, node_outputs, strategy_transaction)
+                continue
+            try:
+                decision, path, node_outputs = self._run(strategies[strategy_id], strategy_transaction, shared_results, node_timings)
+            except ValueError as e:
+                logger.warning(f"Shadow strategy '{strategy_id}' failed: {e}")
+                result.failed[strategy_id] = str(e)
+                continue
+            except Exception as e:
+                logger.exception(f"Shadow strategy '{strategy_id}' failed unexpectedly: {e}")
+                result.failed[strategy_id] = "An internal error occurred during execution."
+                continue
+            self._log_decision(strategy_id, 'shadow', decision, path, strategy_transaction, started, node_timings)
+            result.traces[strategy_id] = self._record_shadow(strategy_id, decision, path, node_outputs, strategy_transaction)
+        return result
+
+    def _run_shared(self, current_node: Node, logic_function, transaction: Transaction,
+                    shared_results: SharedResults) -> Tuple[str | None, dict]:
+        """
+        Runs a feature or model node, reusing the result of an identical node that was
+        already evaluated against the same transaction state. The key covers everything
+        these nodes read, so a cache hit is indistinguishable from running the node.
+        Nodes seeing unhashable feature values (e.g. lists sent by the client) are not shared.
+        """
+        key = (
+            current_node.data.get('label'),
+            repr(current_node.data.get('value')),
+            tuple(sorted(transaction.features.items())),
+            transaction.model_score,
+        )
+        try:
+            cached = shared_results.get(key)
+        except TypeError:
+            return logic_function(current_node, transaction)
+        if cached is None:
+            features_before = dict(transaction.features)
+            handle, output_data = logic_function(current_node, transaction)
+            features_added = {k: v for k, v in transaction.features.items() if features_before.get(k, object()) != v}
+            shared_results[key] = (handle, output_data, features_added, transaction.model_score, transaction.model_input)
+            return handle, output_data
+
+        handle, output_data, features_added, model_score, model_input = cached
+        transaction.features.update(features_added)
+        transaction.model_score = model_score
+        transaction.model_input = model_input
+        return handle, dict(output_data) if output_data else output_data
+
+    def _run(self, blueprint: StrategyBlueprint, transaction: Transaction,
+             shared_results: SharedResults | None = None, node_timings: Dict[str, float] | None = None
+             ) -> Tuple[str, List[ExecutionStep], Dict[str, Any]]:
         """
         Traverses the strategy graph using a topological sort to handle complex,
         branching logic with nodes like AND/OR that have multiple inputs.
+        If `node_timings` is given, it is filled with each node's run time in ms.
         """
 
         nodes_map: Dict[str, Node] = {node.id: node for node in blueprint.nodes}
@@ -121,7 +295,13 @@ class ExecutionEngine:
                 kwargs['parent_results'] = {p_id: node_results.get(p_id, False) for p_id in parent_ids}
 
             # Execute logic function
-            handle, output_data = logic_function(current_node, transaction, **kwargs)
+            node_started = time.perf_counter()
+            if shared_results is not None and node_type in SHAREABLE_NODE_TYPES:
+                handle, output_data = self._run_shared(current_node, logic_function, transaction, shared_results)
+            else:
+                handle, output_data = logic_function(current_node, transaction, **kwargs)
+            if node_timings is not None:
+                node_timings[node_id] = (time.perf_counter() - node_started) * 1000
             if output_data:
                 node_outputs[node_id] = {**node_outputs.get(node_id, {}), **output_data}
             
@@ -161,21 +341,71 @@ class ExecutionEngine:
         path.reverse()
         decision = nodes_map[final_decision_node_id].data.get('label', 'REVIEW') if final_decision_node_id else 'REVIEW'
 
+        return decision, path, node_outputs
+
+    def _log_decision(self, strategy_id: str, role: str, decision: str, path: List[ExecutionStep],
+                      transaction: Transaction, started: float, node_timings: Dict[str, float]):
+        """Queues the decision for the decision log; the write happens on the log's own thread."""
+        if not self.decision_log.is_running:
+            return
+        self.decision_log.submit(DecisionRecord(
+            timestamp=time.time(),
+            transaction_id=transaction.transaction_id,
+            customer_id=transaction.id,
+            strategy_id=strategy_id,
+            role=role,
+            decision=decision,
+            is_fraud=transaction.isFraud,
+            amount=transaction.amount,
+            model_score=transaction.model_score,
+            features=dict(transaction.features),
+            model_input=transaction.model_input,
+            path=[step.nodeId for step in path],
+            total_ms=(time.perf_counter() - started) * 1000,
+            node_timings_ms=node_timings,
+        ))
+
+    def _record_production(self, decision: str, path: List[ExecutionStep], node_outputs: Dict[str, Any],
+                           transaction: Transaction) -> ExecutionTrace:
+        """Records a production decision in Firestore and the sliding-window metrics."""
+        from google.cloud.firestore_v1.transforms import Increment
+
         # update counters in Firestore
         update_payload = {}
         if decision == 'BLOCK' and transaction.isFraud:
-            update_payload = {"true_positives": firestore.Increment(1)}
+            update_payload = {"true_positives": Increment(1)}
         elif decision == 'BLOCK' and not transaction.isFraud:
-            update_payload = {"false_positives": firestore.Increment(1)}
+            update_payload = {"false_positives": Increment(1)}
         elif decision == 'APPROVE' and transaction.isFraud:
-            update_payload = {"false_negatives": firestore.Increment(1)}
+            update_payload = {"false_negatives": Increment(1)}
         
         if update_payload:
-            METRICS_DOC_REF.set(update_payload, merge=True)
+            get_metrics_doc_ref().set(update_payload, merge=True)
+
+        self.window_metrics.record(decision, transaction.isFraud, transaction.model_score)
 
         # get the latest metrics and calculate precision/recall
         current_metrics = self._get_metrics()
         precision, recall = self._calculate_metrics(current_metrics)
 
 
-        return ExecutionTrace(decision=decision, path=path, node_outputs=node_outputs, precision=precision, recall=recall)
\ No newline at end of file
+        return ExecutionTrace(decision=decision, path=path, node_outputs=node_outputs, precision=precision, recall=recall)
+
+    def _record_shadow(self, strategy_id: str, decision: str, path: List[ExecutionStep], node_outputs: Dict[str, Any],
+                       transaction: Transaction) -> ExecutionTrace:
+        """Records a shadow decision in the strategy's own sliding-window metrics only."""
+        with self._shadow_lock:
+            metrics = self.shadow_metrics.get(strategy_id)
+            if metrics is None:
+                metrics = self.shadow_metrics[strategy_id] = WindowedMetrics()
+                if len(self.shadow_metrics) > MAX_SHADOW_STRATEGIES:
+                    evicted, _ = self.shadow_metrics.popitem(last=False)
+                    logger.info(f"Evicted the metrics of shadow strategy '{evicted}' (least recently used).")
+            else:
+                self.shadow_metrics.move_to_end(strategy_id)
+        metrics.record(decision, transaction.isFraud, transaction.model_score)
+
+        # Shadow strategies report precision/recall over their longest window
+        snapshot = metrics.snapshot(metrics.windows[-1])
+        return ExecutionTrace(decision=decision, path=path, node_outputs=node_outputs,
+                              precision=snapshot["precision"], recall=snapshot["recall"])
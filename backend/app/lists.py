@@ -0,0 +1,207 @@
+"""
+Blocklists and allowlists (customer IDs, terminal IDs) for the
+List Membership node.
+
+Lists are built offline into versioned directories:
+
+    <root>/<list name>/CURRENT          name of the published version
+    <root>/<list name>/<version>/keys.npy     sorted, unique 64-bit key hashes
+    <root>/<list name>/<version>/bloom.npy    Bloom filter bits
+    <root>/<list name>/<version>/manifest.json
+
+Both arrays are memory-mapped, so opening a million-entry list costs no reads,
+every worker process shares the same pages through the OS page cache, and a
+lookup is a Bloom filter probe followed, only for probable members, by a binary
+search. Publishing a new version rewrites CURRENT atomically; running instances
+pick it up on their next refresh.
+
+Build a list with:
+    python -m app.lists --root lists --name blocked_customers --input blocked_customers.txt
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = 'CURRENT'
+# How often a list's CURRENT file is checked for a newly published version
+RELOAD_INTERVAL_SECONDS = 10.0
+# List names and versions are directory names, so they cannot contain path separators or '..'
+NAME_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+# Unknown list names remembered as missing until the next reload interval
+MAX_MISSING_LISTS = 1024
+
+
+def validate_name(name: str, kind: str = 'list name') -> str:
+    if not isinstance(name, str) or not NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"Invalid {kind} {name!r}. Use letters, digits, '_' and '-' only.")
+    return name
+
+
+def hash_key(value: Any) -> int:
+    """Hashes a list entry to 64 bits. Values are compared as strings, so 123 and "123" match."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'little')
+
+
+def _bloom_positions(key_hash: int, n_bits: int, n_hashes: int) -> Iterable[int]:
+    # Double hashing: k probe positions derived from the two halves of one 64-bit hash
+    h1, h2 = key_hash & 0xFFFFFFFF, (key_hash >> 32) | 1
+    return ((h1 + i * h2) % n_bits for i in range(n_hashes))
+
+
+class MembershipIndex:
+    """A read-only, memory-mapped list version."""
+
+    def __init__(self, path: Path):
+        with open(path / 'manifest.json') as f:
+            self.manifest = json.load(f)
+        self.version: str = self.manifest['version']
+        # Buffer views of the mappings: indexing them yields plain ints, with no NumPy scalar per access
+        self._keys = memoryview(np.load(path / 'keys.npy', mmap_mode='r').view(np.ndarray))
+        self._bloom = memoryview(np.load(path / 'bloom.npy', mmap_mode='r').view(np.ndarray))
+        self._n_bits: int = self.manifest['bloom_bits']
+        self._n_hashes: int = self.manifest['bloom_hashes']
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def contains(self, value: Any) -> bool:
+        key_hash = hash_key(value)
+        bloom = self._bloom
+        for bit in _bloom_positions(key_hash, self._n_bits, self._n_hashes):
+            if not bloom[bit >> 3] & (1 << (bit & 7)):
+                return False
+        # Probable member: confirm against the sorted keys to rule out a false positive
+        keys = self._keys
+        pos = bisect.bisect_left(keys, key_hash)
+        return pos < len(keys) and keys[pos] == key_hash
+
+
+def build_membership_index(values: Iterable[Any], root: str | Path, name: str, version: str | None = None,
+                           false_positive_rate: float = 0.01) -> Path:
+    """
+    Builds a list version from raw values and publishes it by atomically pointing
+    the list's CURRENT file at it. Returns the version directory.
+    """
+    keys = np.unique(np.fromiter((hash_key(value) for value in values), dtype=np.uint64))
+    n = max(len(keys), 1)
+    n_bits = max(64, int(math.ceil(-n * math.log(false_positive_rate) / math.log(2) ** 2)))
+    n_bits = (n_bits + 7) // 8 * 8
+    n_hashes = max(1, round(n_bits / n * math.log(2)))
+
+    bloom = np.zeros(n_bits // 8, dtype=np.uint8)
+    h1 = keys & np.uint64(0xFFFFFFFF)
+    h2 = (keys >> np.uint64(32)) | np.uint64(1)
+    for i in range(n_hashes):
+        bits = (h1 + np.uint64(i) * h2) % np.uint64(n_bits)
+        np.bitwise_or.at(bloom, (bits >> np.uint64(3)).astype(np.int64), (np.uint8(1) << (bits & np.uint64(7)).astype(np.uint8)))
+
+    list_dir = Path(root) / validate_name(name)
+    version = validate_name(version or time.strftime('%Y%m%dT%H%M%S'), 'version')
+    version_dir = list_dir / version
+    version_dir.mkdir(parents=True, exist_ok=False)
+    np.save(version_dir / 'keys.npy', keys)
+    np.save(version_dir / 'bloom.npy', bloom)
+    with open(version_dir / 'manifest.json', 'w') as f:
+        json.dump({'name': name, 'version': version, 'count': int(len(keys)),
+                   'bloom_bits': n_bits, 'bloom_hashes': n_hashes, 'false_positive_rate': false_positive_rate}, f)
+
+    tmp_current = list_dir / (CURRENT_FILE + '.tmp')
+    tmp_current.write_text(version)
+    os.replace(tmp_current, list_dir / CURRENT_FILE)
+    logger.info(f"Published list '{name}' version {version} with {len(keys)} entries.")
+    return version_dir
+
+
+class ListStore:
+    """A singleton service providing the currently published version of every list."""
+    _root: Path | None = None
+    _indexes: Dict[str, MembershipIndex] = {}
+    _checked_at: Dict[str, float] = {}
+    _missing: "OrderedDict[str, float]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def load_lists(cls, root: str | Path):
+        """Opens every published list under `root`. Missing directories leave the store empty."""
+        cls._root = Path(root)
+        cls._indexes, cls._checked_at, cls._missing = {}, {}, OrderedDict()
+        if not cls._root.is_dir():
+            logger.warning(f"List directory {cls._root} not found. List Membership nodes will fail.")
+            return
+        for list_dir in sorted(cls._root.iterdir()):
+            if NAME_PATTERN.fullmatch(list_dir.name) and (list_dir / CURRENT_FILE).exists():
+                cls._refresh(list_dir.name)
+
+    @classmethod
+    def _refresh(cls, name: str) -> MembershipIndex | None:
+        """
+        Swaps in a newly published version if CURRENT has changed. Names that are not
+        published are remembered as missing, in a bounded map, until the next check.
+        """
+        with cls._lock:
+            now = time.monotonic()
+            current = cls._indexes.get(name)
+            try:
+                version = validate_name((cls._root / name / CURRENT_FILE).read_text().strip(), 'version')
+                if current is None or current.version != version:
+                    index = MembershipIndex(cls._root / name / version)
+                    # A single reference assignment: readers see either the old or the new version
+                    cls._indexes = {**cls._indexes, name: index}
+                    logger.info(f"Loaded list '{name}' version {version} ({len(index)} entries).")
+            except FileNotFoundError:
+                if current is not None:
+                    logger.error(f"List '{name}' is no longer published; keeping version {current.version}.")
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Could not load list '{name}': {e}")
+
+            if name in cls._indexes:
+                cls._checked_at[name] = now
+                cls._missing.pop(name, None)
+            else:
+                cls._missing[name] = now
+                cls._missing.move_to_end(name)
+                while len(cls._missing) > MAX_MISSING_LISTS:
+                    cls._missing.popitem(last=False)
+            return cls._indexes.get(name)
+
+    @classmethod
+    def get(cls, name: str) -> MembershipIndex:
+        if cls._root is None:
+            raise RuntimeError("Lists have not been loaded. Call load_lists() on startup.")
+        validate_name(name)
+        index = cls._indexes.get(name)
+        checked_at = cls._checked_at.get(name) if index is not None else cls._missing.get(name)
+        if checked_at is None or time.monotonic() - checked_at > RELOAD_INTERVAL_SECONDS:
+            index = cls._refresh(name)
+        if index is None:
+            raise ValueError(f"Unknown list '{name}'.")
+        return index
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Build and publish a blocklist/allowlist version.")
+    parser.add_argument("--root", required=True, help="Directory holding all lists.")
+    parser.add_argument("--name", required=True, help="List name, e.g. blocked_customers.")
+    parser.add_argument("--input", required=True, help="Text file with one entry per line.")
+    parser.add_argument("--version", help="Version name. Defaults to a timestamp.")
+    parser.add_argument("--false-positive-rate", type=float, default=0.01, help="Target Bloom filter false positive rate.")
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        entries = (line.strip() for line in f)
+        build_membership_index((entry for entry in entries if entry), args.root, args.name, args.version, args.false_positive_rate)
@@ -0,0 +1,188 @@
+import ast
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..schemas import Transaction
+
+# Transaction fields an expression may read. Features attached by feature nodes are
+# read as `features.<name>` (e.g. features.velocity_24h) and default to 0 when absent.
+# A division by zero gives NaN, so any comparison on it except != is False.
+TRANSACTION_FIELDS = ('amount', 'model_score')
+FEATURES_NAMESPACE = 'features'
+MAX_EXPRESSION_LENGTH = 500
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.Compare, ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div,
+    ast.Constant, ast.Name, ast.Attribute, ast.Load,
+)
+_FEATURE_PREFIX = 'features__'
+_AS_BOOL = '_as_bool'
+_DIVIDE = '_divide'
+
+
+def _is_boolean(node: ast.expr) -> bool:
+    return (isinstance(node, (ast.Compare, ast.BoolOp))
+            or (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not))
+            or (isinstance(node, ast.Constant) and isinstance(node.value, bool)))
+
+
+def _divide(left, right):
+    """Division shared by both evaluation paths: x / 0 is NaN rather than an error or inf."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(np.equal(right, 0), np.nan, np.true_divide(left, right))
+
+
+class _Validator(ast.NodeVisitor):
+    """Rejects anything outside the whitelisted fields, literals and operators."""
+
+    def generic_visit(self, node: ast.AST):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+        super().generic_visit(node)
+
+    def visit_BinOp(self, node: ast.BinOp):
+        if _is_boolean(node.left) or _is_boolean(node.right):
+            raise ValueError("Arithmetic is only allowed on numbers, not on comparisons or and/or/not.")
+        self.generic_visit(node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp):
+        if not isinstance(node.op, ast.Not) and _is_boolean(node.operand):
+            raise ValueError("Arithmetic is only allowed on numbers, not on comparisons or and/or/not.")
+        self.generic_visit(node)
+
+    def visit_Compare(self, node: ast.Compare):
+        # and/or evaluate to one of their operands, so their value is only meaningful as a condition
+        if any(isinstance(operand, ast.BoolOp) for operand in [node.left] + node.comparators):
+            raise ValueError("and/or can only be combined with and/or/not, not compared.")
+        self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        if isinstance(node.value, str) or not isinstance(node.value, (int, float, bool)):
+            raise ValueError(f"Unsupported literal in expression: {node.value!r}")
+
+    def visit_Name(self, node: ast.Name):
+        if node.id not in TRANSACTION_FIELDS:
+            raise ValueError(f"Unknown field '{node.id}'. Allowed fields: {', '.join(TRANSACTION_FIELDS)}, features.<name>")
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if not (isinstance(node.value, ast.Name) and node.value.id == FEATURES_NAMESPACE):
+            raise ValueError("Only attributes of 'features' can be accessed, e.g. features.velocity_24h")
+
+
+class _FlattenFeatures(ast.NodeTransformer):
+    """
+    Rewrites `features.x` into a plain variable so evaluation needs no attribute access,
+    and `/` into `_divide` so both evaluation paths agree on division by zero.
+    """
+
+    def __init__(self):
+        self.features: List[str] = []
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Div):
+            return ast.copy_location(ast.Call(func=ast.Name(id=_DIVIDE, ctx=ast.Load()), args=[node.left, node.right], keywords=[]), node)
+        return node
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.Name:
+        if node.attr not in self.features:
+            self.features.append(node.attr)
+        return ast.copy_location(ast.Name(id=_FEATURE_PREFIX + node.attr, ctx=ast.Load()), node)
+
+
+class _Vectorize(ast.NodeTransformer):
+    """
+    Rewrites Python boolean logic into element-wise NumPy operations:
+    `and`/`or`/`not` become `&`/`|`/`~` and chained comparisons are split into pairs.
+    """
+
+    def _bool(self, node: ast.expr) -> ast.expr:
+        return ast.Call(func=ast.Name(id=_AS_BOOL, ctx=ast.Load()), args=[node], keywords=[])
+
+    def _combine(self, op: ast.operator, operands: List[ast.expr]) -> ast.expr:
+        result = operands[0]
+        for operand in operands[1:]:
+            result = ast.BinOp(left=result, op=op, right=operand)
+        return result
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.expr:
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        return self._combine(op, [self._bool(value) for value in node.values])
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=self._bool(node.operand))
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.expr:
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        pairs = [ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]]) for i, op in enumerate(node.ops)]
+        return self._combine(ast.BitAnd(), pairs)
+
+
+class CompiledExpression:
+    """
+    An analyst-written condition, validated and compiled once. `evaluate` runs it
+    against a single transaction; `evaluate_batch` runs it over column arrays.
+    """
+
+    def __init__(self, source: str):
+        if not source or not source.strip():
+            raise ValueError("Expression Rule requires an expression.")
+        if len(source) > MAX_EXPRESSION_LENGTH:
+            raise ValueError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters.")
+        try:
+            tree = ast.parse(source.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression: {e.msg}")
+        _Validator().visit(tree)
+
+        flattener = _FlattenFeatures()
+        tree = ast.fix_missing_locations(flattener.visit(tree))
+        self.source = source.strip()
+        self.features = flattener.features
+        self._scalar_code = compile(tree, '<expression>', 'eval')
+        vector_tree = ast.fix_missing_locations(_Vectorize().visit(tree))
+        self._vector_code = compile(vector_tree, '<expression>', 'eval')
+
+    def evaluate(self, transaction: Transaction) -> bool:
+        variables: Dict[str, Any] = {
+            _DIVIDE: _divide,
+            'amount': transaction.amount,
+            'model_score': transaction.model_score if transaction.model_score is not None else 0.0,
+        }
+        for name in self.features:
+            variables[_FEATURE_PREFIX + name] = transaction.features.get(name, 0.0)
+        try:
+            return bool(eval(self._scalar_code, {'__builtins__': {}}, variables))
+        except (ArithmeticError, TypeError) as e:
+            raise ValueError(f"Could not evaluate expression '{self.source}': {e}")
+
+    def evaluate_batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluates the expression for many transactions at once. `columns` maps field
+        names ('amount', 'model_score', 'features.<name>') to equal-length arrays;
+        missing fields are treated as 0. Returns a boolean mask.
+        """
+        size = len(next(iter(columns.values()))) if columns else 0
+        variables: Dict[str, Any] = {_AS_BOOL: lambda values: np.asarray(values).astype(bool), _DIVIDE: _divide}
+        for field in TRANSACTION_FIELDS:
+            variables[field] = np.asarray(columns.get(field, 0.0), dtype=np.float64)
+        for name in self.features:
+            variables[_FEATURE_PREFIX + name] = np.asarray(columns.get(f'{FEATURES_NAMESPACE}.{name}', 0.0), dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = eval(self._vector_code, {'__builtins__': {}}, variables)
+        return np.broadcast_to(np.asarray(result).astype(bool), (size,)).copy()
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str) -> CompiledExpression:
+    """Compiles an expression, reusing the compiled form for every later transaction and blueprint."""
+    return CompiledExpression(source)
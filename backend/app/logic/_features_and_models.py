@@ -1,5 +1,6 @@
 from ..schemas import Node, Transaction
-from ..services import FeatureStore, ModelLoader
+from ..services import FeatureStore, ModelLoader, MODEL_FEATURES
+from ..drift import DriftMonitor, MODEL_SCORE
 import pandas as pd
 from datetime import datetime
 from typing import Tuple, Dict, Any
@@ -54,12 +55,7 @@ def xgboost_model(node: Node, transaction: Transaction, **kwargs) -> Tuple[None,
     features['HourOfDay'] = now.hour
 
     # This list reflects the true state of the model's training data
-    expected_features = [
-        'TX_AMOUNT', 'TX_DURING_WEEKEND', 'HourOfDay',
-        'CUSTOMER_ID_NB_TX_1H', 'CUSTOMER_ID_NB_TX_24H', 'CUSTOMER_ID_NB_TX_7D',
-        'CUSTOMER_ID_AMOUNT_ZSCORE_30D', 'CUSTOMER_ID_TIME_SINCE_LAST_TX',
-        'TERMINAL_ID_RISK_30D', 'CUSTOMER_ID_TERMINAL_ID_NB_TX_30D'
-    ]
+    expected_features = MODEL_FEATURES
     
     # OVERWRITE with values calculated from connected feature nodes
     if 'spending_deviation' in transaction.features:
@@ -75,6 +71,11 @@ def xgboost_model(node: Node, transaction: Transaction, **kwargs) -> Tuple[None,
     # Predict and attach the score to the transaction object for subsequent nodes.
     score = model.predict_proba(input_df)[0][1]
     transaction.model_score = score
+    # Keep the exact vector scored, so the decision log can feed retraining and backtests
+    transaction.model_input = dict(zip(expected_features, input_df.to_numpy(dtype=float)[0].tolist()))
+
+    # Track what the model is actually served, for drift detection against training data
+    DriftMonitor.observe({**transaction.model_input, MODEL_SCORE: score})
 
     output_data = {"Predicted Fraud Score": f"{score:.4f}"}
     return None, output_data
\ No newline at end of file
@@ -1,5 +1,7 @@
 from ..schemas import Node, Transaction
 from typing import Tuple, Dict, Any
+from ._expressions import compile_expression
+from ..lists import ListStore
 
 def amount_gate(node: Node, transaction: Transaction) -> Tuple[str, dict]:
     threshold = node.data.get('value', 0)
@@ -47,3 +49,43 @@ def or_gate(node: Node, transaction: Transaction, parent_results: Dict[str, Any]
         "Outcome": str(final_result).upper()
     }
     return 'true' if final_result else 'false', output_data
+
+def expression_rule(node: Node, transaction: Transaction) -> Tuple[str, dict]:
+    # The expression is parsed and compiled once, then reused for every transaction
+    expression = compile_expression(node.data.get('expression', ''))
+    result = expression.evaluate(transaction)
+
+    output_data = {
+        "Condition": expression.source,
+        "Outcome": str(result).upper()
+    }
+
+    return 'true' if result else 'false', output_data
+
+# Transaction fields a list can be keyed on, besides the customer ID
+LIST_KEY_FIELDS = ('terminal_id',)
+
+def list_membership(node: Node, transaction: Transaction) -> Tuple[str, dict]:
+    list_name = node.data.get('list')
+    if not list_name:
+        raise ValueError("List Membership requires a list name.")
+    field = node.data.get('field', 'customer_id')
+
+    # The customer is the transaction itself; other keys are transaction fields, or features attached upstream
+    if field == 'customer_id':
+        value = transaction.id
+    elif field in LIST_KEY_FIELDS and getattr(transaction, field) is not None:
+        value = getattr(transaction, field)
+    else:
+        value = transaction.features.get(field)
+    if value is None:
+        raise ValueError(f"List Membership on '{field}' requires the transaction to carry a {field}.")
+    result = ListStore.get(list_name).contains(value)
+
+    output_data = {
+        "List": list_name,
+        "Condition": f"{field} = {value} in {list_name}",
+        "Outcome": str(result).upper()
+    }
+
+    return 'true' if result else 'false', output_data
@@ -1,4 +1,4 @@
-from ._rules import amount_gate, threshold_gate, and_gate, or_gate
+from ._rules import amount_gate, threshold_gate, and_gate, or_gate, expression_rule, list_membership
 from ._features_and_models import (
     spending_deviation, 
     xgboost_model,
@@ -12,6 +12,8 @@ NODE_LOGIC_REGISTRY = {
     "Threshold Gate": threshold_gate,
     "AND Gate": and_gate,
     "OR Gate": or_gate,
+    "Expression Rule": expression_rule,
+    "List Membership": list_membership,
 
     # --- UPDATED: REGISTER ALL FEATURE NODES ---
     "Spending Deviation": spending_deviation,
@@ -1,17 +1,46 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import Any, Callable, List
 from contextlib import asynccontextmanager
-from .schemas import ExecutionRequest, ExecutionTrace, Transaction, ProfileData 
+from .schemas import ExecutionRequest, ExecutionTrace, MultiExecutionRequest, MultiExecutionTrace, Transaction, ProfileData, ProfileBatch, WindowMetrics, DriftReport
 from .engine import ExecutionEngine
 from .services import ModelLoader, FeatureStore
+from .drift import DriftMonitor
+from .lists import ListStore
+import hashlib
 import logging
+import os
 from pathlib import Path
 from fastapi.middleware.cors import CORSMiddleware
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 MODEL_PATH = BASE_DIR / "./models/xgboost_v1.joblib"
 FEATURE_STORE_PATH = BASE_DIR / "./data/feature_store.parquet"
-NAMES = ["Amelia Chen", "Ben Carter", "Chloe Davis", "David Rodriguez", "Eva Williams", "Frank Miller", "Grace Lee", "Henry Jones"]
-CATEGORIES = ["Groceries", "Utilities", "Transport", "Dining", "Software", "Travel", "Electronics", "Books"]
+REFERENCE_SKETCH_PATH = BASE_DIR / "./models/xgboost_v1_reference.json"
+# Blocklists/allowlists published by `python -m app.lists`, picked up without a restart
+LISTS_DIR = Path(os.environ.get("LISTS_DIR", BASE_DIR / "./lists"))
+# Parquet audit trail of every decision; point it at a mounted bucket in production
+DECISION_LOG_DIR = Path(os.environ.get("DECISION_LOG_DIR", BASE_DIR / "./decision_log"))
+MAX_PROFILE_BATCH = 500
+# Transactions the simulation may prefetch at once, so their profiles come in one bulk request
+MAX_TRANSACTION_BATCH = 50
+# Profiles only change when a new feature store is deployed, which also changes the ETag
+PROFILE_CACHE_CONTROL = "public, max-age=300"
+
+
+def _is_ready() -> bool:
+    """An instance is ready only if the model and feature store loaded and every node warmed up."""
+    problems = []
+    if ModelLoader._model is None:
+        problems.append("model not loaded")
+    if FeatureStore._customer_df is None:
+        problems.append("feature store not loaded")
+    if engine.warm_up_failures:
+        problems.append(f"warm-up failed for {', '.join(engine.warm_up_failures)}")
+    if problems:
+        logger.error(f"Instance is not ready: {'; '.join(problems)}.")
+    return not problems
 
 
 @asynccontextmanager
@@ -19,13 +48,24 @@ async def lifespan(app: FastAPI):
     logger.info("Application startup...")
     ModelLoader.load_model(MODEL_PATH)
     FeatureStore.load_feature_store(FEATURE_STORE_PATH)
+    ListStore.load_lists(LISTS_DIR)
+    # Pay first-call costs before serving traffic, then report ready on /ready
+    customer_df = FeatureStore._customer_df
+    engine.warm_up(int(customer_df.index[0]) if customer_df is not None and not customer_df.empty else 0)
+    # Loaded after warm-up so the synthetic transaction is not counted as served traffic
+    DriftMonitor.load_reference(REFERENCE_SKETCH_PATH)
+    engine.decision_log.start(DECISION_LOG_DIR)
+    app.state.ready = _is_ready()
     yield
     logger.info("Application shutdown...")
+    app.state.ready = False
+    engine.decision_log.stop()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Decision Engine API", lifespan=lifespan)
+app.state.ready = False
 engine = ExecutionEngine()
 
 origins = [
@@ -48,33 +88,79 @@ def read_root():
     return {"status": "ok", "message": "Decision Engine is running"}
 
 
-@app.get("/profiles/{customer_id}", response_model=ProfileData)
-def get_customer_profile(customer_id: int):
+@app.get("/ready")
+def read_ready():
+    """Readiness probe: succeeds only once startup and warm-up have completed."""
+    if not app.state.ready:
+        raise HTTPException(status_code=503, detail="Decision Engine is warming up.")
+    return {"status": "ready"}
+
+
+def _cached_response(etag: str, if_none_match: str | None, build_payload: Callable[[], Any]) -> Response:
+    """
+    Serves a payload with an ETag tied to the feature store version, answering
+    with 304 Not Modified (without building the payload) when the client
+    already holds the current copy.
+    """
+    headers = {"ETag": etag, "Cache-Control": PROFILE_CACHE_CONTROL}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=jsonable_encoder(build_payload()), headers=headers)
+
+
+@app.get("/profiles", response_model=ProfileBatch)
+def get_customer_profiles(ids: str, if_none_match: str | None = Header(default=None)):
     """
-    Fetches aggregated features for a customer and enriches it with mock data.
+    Fetches the precomputed profiles for a comma-separated list of customer IDs.
+    Unknown customers are reported in `missing` rather than failing the batch.
     """
     if FeatureStore._customer_df is None:
         raise HTTPException(status_code=503, detail="Feature store not loaded.")
-    
+
     try:
-        customer_data = FeatureStore._customer_df.loc[customer_id]
-        
-        # Deterministically generate a name based on customer_id
-        customer_name = NAMES[customer_id % len(NAMES)]
-
-        profile = ProfileData(
-            name=customer_name,
-            customerId=str(customer_id),
-            # Extract real aggregated features from our feature store
-            avgTransaction=customer_data.get('CUSTOMER_ID_AVG_AMOUNT_30D', 0),
-            activityLevel=int(customer_data.get('CUSTOMER_ID_NB_TX_30D', 0)),
-            # For V1, categories are mocked but could be derived in a real system
-            typicalCategories=CATEGORIES[(customer_id % 4):(customer_id % 4) + 3]
-        )
-        return profile
-    except KeyError:
+        customer_ids = sorted({int(customer_id) for customer_id in ids.split(",") if customer_id.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers.")
+    if len(customer_ids) > MAX_PROFILE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PROFILE_BATCH} profiles can be requested at once.")
+
+    ids_digest = hashlib.sha1(",".join(map(str, customer_ids)).encode()).hexdigest()[:16]
+    etag = f'"{FeatureStore.get_version()}-{ids_digest}"'
+
+    def build_batch() -> ProfileBatch:
+        profiles, missing = FeatureStore.get_profiles(customer_ids)
+        return ProfileBatch(profiles=profiles, missing=missing, version=FeatureStore.get_version())
+
+    return _cached_response(etag, if_none_match, build_batch)
+
+
+@app.get("/profiles/{customer_id}", response_model=ProfileData)
+def get_customer_profile(customer_id: int, if_none_match: str | None = Header(default=None)):
+    """
+    Fetches the precomputed profile for a single customer.
+    """
+    if FeatureStore._customer_df is None:
+        raise HTTPException(status_code=503, detail="Feature store not loaded.")
+
+    profiles, _ = FeatureStore.get_profiles([customer_id])
+    if not profiles:
         raise HTTPException(status_code=404, detail=f"Customer with id {customer_id} not found.")
 
+    etag = f'"{FeatureStore.get_version()}-{customer_id}"'
+    return _cached_response(etag, if_none_match, lambda: profiles[0])
+
+
+def _transaction_from_row(row) -> Transaction:
+    # Map the DataFrame columns to our Transaction Pydantic model
+    # The customer ID is the index of the series after our loading logic
+    return Transaction(
+        id=int(row.name),
+        transaction_id=int(row['TRANSACTION_ID']) if 'TRANSACTION_ID' in row else None,
+        amount=row['TX_AMOUNT'],
+        isFraud=bool(row['TX_FRAUD']),
+        terminal_id=int(row['TERMINAL_ID']) if 'TERMINAL_ID' in row else None
+    )
+
 
 @app.get("/transactions/next", response_model=Transaction)
 def get_next_transaction():
@@ -86,16 +172,22 @@ def get_next_transaction():
         raise HTTPException(status_code=503, detail="Feature store is not loaded or is empty.")
 
     # Select a random row from the DataFrame
-    random_transaction_series = FeatureStore._customer_df.sample(n=1).iloc[0]
+    return _transaction_from_row(FeatureStore._customer_df.sample(n=1).iloc[0])
 
-    # Map the DataFrame columns to our Transaction Pydantic model
-    # The customer ID is the index of the series after our loading logic
-    transaction = Transaction(
-        id=int(random_transaction_series.name),
-        amount=random_transaction_series['TX_AMOUNT'],
-        isFraud=bool(random_transaction_series['TX_FRAUD'])
-    )
-    return transaction
+
+@app.get("/transactions/batch", response_model=List[Transaction])
+def get_transaction_batch(size: int = 20):
+    """
+    Fetches several random transactions at once, so the simulation can queue them
+    and load all of their customer profiles with a single bulk request.
+    """
+    if FeatureStore._customer_df is None or FeatureStore._customer_df.empty:
+        raise HTTPException(status_code=503, detail="Feature store is not loaded or is empty.")
+    if not 1 <= size <= MAX_TRANSACTION_BATCH:
+        raise HTTPException(status_code=400, detail=f"size must be between 1 and {MAX_TRANSACTION_BATCH}.")
+
+    sample = FeatureStore._customer_df.sample(n=size, replace=True)
+    return [_transaction_from_row(row) for _, row in sample.iterrows()]
 
 @app.post("/strategy/execute", response_model=ExecutionTrace)
 def execute_strategy(request: ExecutionRequest):
@@ -103,7 +195,7 @@ def execute_strategy(request: ExecutionRequest):
     logger.info(f"Blueprint contains {len(request.blueprint.nodes)} nodes and {len(request.blueprint.edges)} edges.")
     
     try:
-        trace = engine.execute(request.blueprint, request.transaction)
+        trace = engine.execute(request.blueprint, request.transaction, request.strategy_id)
         logger.info("Execution successful. Returning trace.")
         return trace
     except ValueError as e:
@@ -113,8 +205,56 @@ def execute_strategy(request: ExecutionRequest):
         logger.error(f"An unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="An internal error occurred during execution.")
     
+@app.post("/strategy/execute/multi", response_model=MultiExecutionTrace)
+def execute_strategies(request: MultiExecutionRequest):
+    """
+    Executes a champion strategy alongside shadow strategies on the same transaction,
+    sharing feature and model computation between them.
+    """
+    logger.info(f"Received multi-strategy execution request for transaction ID: {request.transaction.id}")
+    logger.info(f"Executing {len(request.strategies)} strategies with champion '{request.champion}'.")
+
+    try:
+        return engine.execute_many(request.strategies, request.transaction, request.champion)
+    except ValueError as e:
+        logger.error(f"Execution error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="An internal error occurred during execution.")
+
 @app.post("/simulation/reset")
 def reset_simulation():
     """Resets the engine's performance metrics to zero."""
     engine.reset()
-    return {"status": "ok", "message": "Simulation metrics reset."}
\ No newline at end of file
+    return {"status": "ok", "message": "Simulation metrics reset."}
+
+@app.get("/simulation/metrics", response_model=List[WindowMetrics])
+def get_simulation_metrics(window: str | None = None, strategy_id: str | None = None):
+    """
+    Returns sliding-window decision metrics. Without a `window` query parameter
+    every configured window (e.g. 1m, 15m, 1h) is returned. `strategy_id` selects
+    a shadow strategy's stream; the production stream is returned by default.
+    """
+    metrics = engine.window_metrics if strategy_id is None else engine.shadow_metrics.get(strategy_id)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail=f"No metrics recorded for strategy '{strategy_id}'.")
+
+    windows = [window] if window else metrics.windows
+    try:
+        return [metrics.snapshot(name) for name in windows]
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown metrics window '{window}'.")
+
+@app.get("/monitoring/drift", response_model=DriftReport)
+def get_feature_drift(window: str = "1h"):
+    """
+    Compares the distribution of the features served to the model over a window
+    with the training reference, reporting PSI and KS per feature.
+    """
+    if not DriftMonitor.is_enabled():
+        raise HTTPException(status_code=503, detail="Reference sketch not loaded.")
+    try:
+        return DriftMonitor.report(window)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown drift window '{window}'.")
@@ -0,0 +1,155 @@
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Default sliding windows: name -> (window length in seconds, bucket width in seconds).
+# Each window keeps a fixed number of buckets, so memory does not grow with traffic.
+DEFAULT_WINDOWS: Dict[str, Tuple[int, int]] = {
+    "1m": (60, 1),
+    "15m": (900, 15),
+    "1h": (3600, 60),
+}
+
+SCORE_BINS = 10
+
+
+class TimeBucketRing:
+    """
+    A ring of time buckets, each holding a vector of counters.
+
+    Buckets are reused as time moves forward; expired buckets are subtracted
+    from a running total, so both `add` and `totals` are amortised O(1) in the
+    number of buckets and memory is fixed at `n_buckets * width` counters.
+    """
+
+    def __init__(self, window_seconds: int, bucket_seconds: int, width: int):
+        if window_seconds % bucket_seconds != 0:
+            raise ValueError("window_seconds must be a multiple of bucket_seconds")
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = window_seconds // bucket_seconds
+        self._counts = np.zeros((self.n_buckets, width), dtype=np.int64)
+        self._totals = np.zeros(width, dtype=np.int64)
+        self._head: int | None = None  # absolute index of the newest bucket
+
+    def _advance(self, now: float) -> int:
+        """Moves the head to the bucket containing `now`, expiring any buckets that fell out of the window."""
+        epoch = int(now // self.bucket_seconds)
+        if self._head is None:
+            self._head = epoch
+        elif epoch > self._head:
+            # Only the buckets between the old head and the new one need clearing,
+            # bounded by the ring size.
+            for stale in range(self._head + 1, min(epoch, self._head + self.n_buckets) + 1):
+                slot = stale % self.n_buckets
+                self._totals -= self._counts[slot]
+                self._counts[slot] = 0
+            self._head = epoch
+        return epoch
+
+    def add(self, now: float, index: int | np.ndarray, amount: int = 1):
+        """
+        Increments counter `index` (or an array of distinct counters) in the bucket for `now`.
+        Late events older than the window are ignored.
+        """
+        epoch = self._advance(now)
+        if epoch <= self._head - self.n_buckets:
+            return
+        self._counts[epoch % self.n_buckets, index] += amount
+        self._totals[index] += amount
+
+    def totals(self, now: float) -> np.ndarray:
+        """Returns the counters summed over the window ending at `now`."""
+        self._advance(now)
+        return self._totals.copy()
+
+    def reset(self):
+        self._counts[:] = 0
+        self._totals[:] = 0
+        self._head = None
+
+
+class WindowedMetrics:
+    """
+    Sliding-window decision metrics: the full confusion matrix (REVIEW is tracked
+    separately for fraud and legitimate traffic), decision rates and a model score
+    histogram, over several configurable windows.
+    """
+
+    # Counter layout inside each bucket vector
+    _TP, _FP, _TN, _FN, _REVIEW_FRAUD, _REVIEW_LEGIT, _SCORED = range(7)
+    _SCORE_OFFSET = 7
+    _WIDTH = _SCORE_OFFSET + SCORE_BINS
+
+    def __init__(self, windows: Dict[str, Tuple[int, int]] | None = None):
+        self._lock = threading.Lock()
+        self._rings: Dict[str, TimeBucketRing] = {
+            name: TimeBucketRing(length, bucket, self._WIDTH)
+            for name, (length, bucket) in (windows or DEFAULT_WINDOWS).items()
+        }
+
+    @property
+    def windows(self) -> List[str]:
+        return list(self._rings)
+
+    def _outcome_index(self, decision: str, is_fraud: bool) -> int:
+        if decision == "BLOCK":
+            return self._TP if is_fraud else self._FP
+        if decision == "APPROVE":
+            return self._FN if is_fraud else self._TN
+        return self._REVIEW_FRAUD if is_fraud else self._REVIEW_LEGIT
+
+    def record(self, decision: str, is_fraud: bool, model_score: float | None = None, now: float | None = None):
+        """Records a single decision in every window."""
+        now = time.time() if now is None else now
+        outcome = self._outcome_index(decision, is_fraud)
+        score_bin = None
+        if model_score is not None:
+            score_bin = min(max(int(model_score * SCORE_BINS), 0), SCORE_BINS - 1)
+
+        with self._lock:
+            for ring in self._rings.values():
+                ring.add(now, outcome)
+                if score_bin is not None:
+                    ring.add(now, self._SCORED)
+                    ring.add(now, self._SCORE_OFFSET + score_bin)
+
+    def snapshot(self, window: str, now: float | None = None) -> Dict[str, object]:
+        """Returns the metrics for a single window. Raises KeyError for an unknown window."""
+        now = time.time() if now is None else now
+        ring = self._rings[window]
+        with self._lock:
+            counts = ring.totals(now)
+
+        tp, fp, tn, fn = (int(counts[i]) for i in (self._TP, self._FP, self._TN, self._FN))
+        review_fraud, review_legit = int(counts[self._REVIEW_FRAUD]), int(counts[self._REVIEW_LEGIT])
+        reviews = review_fraud + review_legit
+        total = tp + fp + tn + fn + reviews
+        blocks = tp + fp
+
+        return {
+            "window": window,
+            "window_seconds": ring.n_buckets * ring.bucket_seconds,
+            "total": total,
+            "confusion_matrix": {
+                "true_positives": tp,
+                "false_positives": fp,
+                "true_negatives": tn,
+                "false_negatives": fn,
+                "review_fraud": review_fraud,
+                "review_legit": review_legit,
+            },
+            "precision": tp / blocks if blocks > 0 else 0.0,
+            "recall": tp / (tp + fn) if (tp + fn) > 0 else 0.0,
+            "block_rate": blocks / total if total > 0 else 0.0,
+            "review_rate": reviews / total if total > 0 else 0.0,
+            "approve_rate": (tn + fn) / total if total > 0 else 0.0,
+            "score_histogram": [int(c) for c in counts[self._SCORE_OFFSET:]],
+            "scored": int(counts[self._SCORED]),
+        }
+
+    def reset(self):
+        with self._lock:
+            for ring in self._rings.values():
+                ring.reset()
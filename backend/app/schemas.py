@@ -19,16 +19,21 @@ class StrategyBlueprint(BaseModel):
     edges: List[Edge]
 
 class Transaction(BaseModel):
-    id: int
+    id: int # the customer ID
+    transaction_id: int | None = None
     amount: float
     isFraud: bool
+    # Key a List Membership node can match besides the customer ID
+    terminal_id: int | None = None
     features: Dict[str, Any] = Field(default_factory=dict)
     model_score: float | None = None
+    model_input: Dict[str, float] | None = None # the feature vector the model scored, set by the model node
 
 class ExecutionRequest(BaseModel):
     blueprint: StrategyBlueprint
     transaction: Transaction
     node_outputs: Dict[str, Any] = Field(default_factory=dict)
+    strategy_id: str = 'production' # recorded in the decision log
 
 
 class ExecutionStep(BaseModel):
@@ -42,9 +47,60 @@ class ExecutionTrace(BaseModel):
     precision : float=0
     recall : float=0
 
+class MultiExecutionRequest(BaseModel):
+    strategies: Dict[str, StrategyBlueprint] # keyed by strategy id
+    champion: str # id of the production strategy; all others run in shadow
+    transaction: Transaction
+
+class MultiExecutionTrace(BaseModel):
+    champion: str
+    traces: Dict[str, ExecutionTrace]
+    failed: Dict[str, str] = Field(default_factory=dict) # shadow strategy id -> error
+
 class ProfileData(BaseModel):
     name: str
     customerId: str
     avgTransaction: float
     activityLevel: int
-    typicalCategories: List[str]
\ No newline at end of file
+    typicalCategories: List[str]
+
+class ConfusionMatrix(BaseModel):
+    true_positives: int = 0
+    false_positives: int = 0
+    true_negatives: int = 0
+    false_negatives: int = 0
+    review_fraud: int = 0
+    review_legit: int = 0
+
+class WindowMetrics(BaseModel):
+    window: str
+    window_seconds: int
+    total: int
+    confusion_matrix: ConfusionMatrix
+    precision: float = 0
+    recall: float = 0
+    block_rate: float = 0
+    review_rate: float = 0
+    approve_rate: float = 0
+    score_histogram: List[int] # counts of model scores in equal-width bins over [0, 1]
+    scored: int = 0
+
+class ProfileBatch(BaseModel):
+    profiles: List[ProfileData]
+    missing: List[int] = Field(default_factory=list)
+    version: str # feature store version; clients drop cached profiles when it changes
+
+class FeatureDrift(BaseModel):
+    feature: str
+    observed: int # served values in the window
+    psi: float | None = None # population stability index against the training reference
+    ks: float | None = None # Kolmogorov-Smirnov distance, estimated on the quantile sketch grid
+    p50: float | None = None # estimated from a quantile sketch, to within 5%
+    p95: float | None = None
+    reference_p50: float | None = None
+    reference_p95: float | None = None
+
+class DriftReport(BaseModel):
+    window: str
+    window_seconds: int
+    features: List[FeatureDrift]
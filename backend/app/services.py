@@ -1,10 +1,23 @@
+import numpy as np
 import pandas as pd
-import joblib
 import logging
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+from .schemas import ProfileData
 
 logger = logging.getLogger(__name__)
 
+NAMES = ["Amelia Chen", "Ben Carter", "Chloe Davis", "David Rodriguez", "Eva Williams", "Frank Miller", "Grace Lee", "Henry Jones"]
+CATEGORIES = ["Groceries", "Utilities", "Transport", "Dining", "Software", "Travel", "Electronics", "Books"]
+
+# The features the XGBoost model was trained on, in training order
+MODEL_FEATURES = [
+    'TX_AMOUNT', 'TX_DURING_WEEKEND', 'HourOfDay',
+    'CUSTOMER_ID_NB_TX_1H', 'CUSTOMER_ID_NB_TX_24H', 'CUSTOMER_ID_NB_TX_7D',
+    'CUSTOMER_ID_AMOUNT_ZSCORE_30D', 'CUSTOMER_ID_TIME_SINCE_LAST_TX',
+    'TERMINAL_ID_RISK_30D', 'CUSTOMER_ID_TERMINAL_ID_NB_TX_30D'
+]
+
 class ModelLoader:
     """A singleton service to load and provide the ML model."""
     _model: Any = None
@@ -15,6 +28,8 @@ class ModelLoader:
         if cls._model is None:
             try:
                 logger.info(f"Loading model from {model_path}...")
+                # Imported here: joblib pulls in the model's libraries, which only startup needs
+                import joblib
                 cls._model = joblib.load(model_path)
                 logger.info("Model loaded successfully.")
             except FileNotFoundError:
@@ -29,11 +44,111 @@ class ModelLoader:
             raise RuntimeError("Model has not been loaded. Call load_model() on startup.")
         return cls._model
 
+class AsOfFeatureIndex:
+    """
+    A point-in-time index over the full feature history.
+
+    Rows are stored per customer in contiguous blocks sorted by transaction time,
+    with an offsets table marking where each customer's block starts, so the
+    features of a customer as of a timestamp are found with two binary searches.
+
+    Only feature columns are indexed: labels (TX_FRAUD, TX_FRAUD_SCENARIO) and
+    identifiers are left out, so a lookup can never return a fraud label that
+    would not have been known yet.
+
+    A lookup returns the customer's last row at or before the timestamp. The
+    customer aggregates on a row are computed with shift(1), so they already
+    exclude that row's own transaction: looking up a stored transaction at its own
+    timestamp returns exactly the feature vector the model was trained on for it,
+    which is what backtests replay. Only labels would leak, and they are not indexed.
+    """
+
+    def __init__(self, customer_ids: np.ndarray, offsets: np.ndarray, timestamps: np.ndarray,
+                 values: np.ndarray, columns: List[str]):
+        self.customer_ids = customer_ids # sorted unique customer IDs
+        self.offsets = offsets # customer i owns rows offsets[i]:offsets[i + 1]
+        self.timestamps = timestamps # int64 nanoseconds, sorted within each customer block
+        self.values = values # float64 feature matrix, one row per transaction
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, key_column: str = 'CUSTOMER_ID', time_column: str = 'TX_DATETIME') -> "AsOfFeatureIndex":
+        """Builds the index from the feature store DataFrame, indexing the model features and customer aggregates."""
+        columns = [c for c in MODEL_FEATURES if c in df.columns]
+        columns += [c for c in df.columns if c.startswith('CUSTOMER_ID_') and c not in columns]
+        keys = df[key_column].to_numpy(dtype=np.int64)
+        times = pd.to_datetime(df[time_column]).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+        order = np.lexsort((times, keys))
+        sorted_keys = keys[order]
+        customer_ids, starts = np.unique(sorted_keys, return_index=True)
+
+        return cls(
+            customer_ids=customer_ids,
+            offsets=np.append(starts, len(sorted_keys)).astype(np.int64),
+            timestamps=times[order],
+            values=df[columns].to_numpy(dtype=np.float64)[order],
+            columns=columns,
+        )
+
+    @staticmethod
+    def _to_nanoseconds(timestamps: Any) -> np.ndarray:
+        return pd.DatetimeIndex(pd.to_datetime(np.atleast_1d(timestamps))).as_unit('ns').asi8
+
+    def locate(self, customer_id: int, timestamp: Any) -> int:
+        """
+        Returns the row of the customer's last transaction at or before `timestamp`,
+        or -1 if there is none.
+        """
+        pos = np.searchsorted(self.customer_ids, customer_id)
+        if pos == len(self.customer_ids) or self.customer_ids[pos] != customer_id:
+            return -1
+        start, end = self.offsets[pos], self.offsets[pos + 1]
+        ts = self._to_nanoseconds(timestamp)[0]
+        row = start + np.searchsorted(self.timestamps[start:end], ts, side='right') - 1
+        return int(row) if row >= start else -1
+
+    def locate_bulk(self, customer_ids: Sequence[int], timestamps: Any) -> np.ndarray:
+        """
+        Vectorised `locate` for many (customer, timestamp) pairs. The per-customer
+        binary searches run in lockstep over NumPy arrays, so the cost is
+        O(n log k) array operations rather than n Python-level searches.
+        """
+        keys = np.asarray(customer_ids, dtype=np.int64)
+        ts = self._to_nanoseconds(timestamps)
+        if len(keys) != len(ts):
+            raise ValueError("customer_ids and timestamps must have the same length.")
+        if len(self.customer_ids) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+
+        pos = np.minimum(np.searchsorted(self.customer_ids, keys), len(self.customer_ids) - 1)
+        known = self.customer_ids[pos] == keys
+        start = self.offsets[pos]
+        lo = start.copy()
+        hi = np.where(known, self.offsets[pos + 1], start)
+
+        # Upper-bound search: first row in [start, end) whose time is > ts
+        active = lo < hi
+        while active.any():
+            mid = (lo + hi) // 2
+            go_right = active & (self.timestamps[np.where(active, mid, 0)] <= ts)
+            lo = np.where(go_right, mid + 1, lo)
+            hi = np.where(active & ~go_right, mid, hi)
+            active = lo < hi
+
+        rows = lo - 1
+        return np.where(known & (rows >= start), rows, -1)
+
+
 class FeatureStore:
     """A singleton service to load and provide access to historical feature data."""
     _customer_df: pd.DataFrame | None = None
     _full_df: pd.DataFrame | None = None # Holds the complete dataset
-
+    _profiles: Dict[int, ProfileData] = {} # Precomputed customer profiles, keyed by customer ID
+    _version: str | None = None # Content hash of the loaded profiles, used as the HTTP cache validator
+    _asof_index: AsOfFeatureIndex | None = None # Full feature history for point-in-time lookups, built on first use
+    _store_path: str | None = None
+    _asof_lock = threading.Lock()
 
     @classmethod
     def load_feature_store(cls, store_path: str):
@@ -46,12 +161,63 @@ class FeatureStore:
                 # We only need the latest aggregated features for each customer for real-time lookup
                 cls._customer_df = df.sort_values('TX_DATETIME').drop_duplicates('CUSTOMER_ID', keep='last')
                 cls._customer_df.set_index('CUSTOMER_ID', inplace=True)
+                cls._build_profiles()
+                # The as-of index is only needed by historical replays and backtests, so it is built on their first lookup
+                cls._store_path = store_path
                 logger.info("Feature store loaded successfully.")
             except FileNotFoundError:
                 logger.error(f"Feature store file not found at {store_path}.")
             except Exception as e:
                 logger.error(f"An error occurred loading the feature store: {e}")
 
+    @classmethod
+    def _build_profiles(cls):
+        """
+        Precomputes the profile served for every customer so that profile lookups
+        are a dictionary access instead of a DataFrame row lookup per request.
+        """
+        columns = ['CUSTOMER_ID_AVG_AMOUNT_30D', 'CUSTOMER_ID_NB_TX_30D']
+        table = cls._customer_df.reindex(columns=columns).fillna(0)
+        table['CUSTOMER_ID_NB_TX_30D'] = table['CUSTOMER_ID_NB_TX_30D'].astype(int)
+
+        cls._profiles = {
+            int(customer_id): ProfileData(
+                # Deterministically generate a name based on customer_id
+                name=NAMES[int(customer_id) % len(NAMES)],
+                customerId=str(customer_id),
+                avgTransaction=float(avg_amount),
+                activityLevel=int(activity),
+                # For V1, categories are mocked but could be derived in a real system
+                typicalCategories=CATEGORIES[(int(customer_id) % 4):(int(customer_id) % 4) + 3]
+            )
+            for customer_id, avg_amount, activity in table.itertuples(name=None)
+        }
+        # The version only changes when the served data changes, so it stays stable across instances
+        cls._version = format(int(pd.util.hash_pandas_object(table).sum()) & 0xFFFFFFFFFFFFFFFF, '016x')
+        logger.info(f"Precomputed {len(cls._profiles)} customer profiles (version {cls._version}).")
+
+    @classmethod
+    def get_version(cls) -> str:
+        """Returns the version of the loaded feature store data."""
+        if cls._version is None:
+            raise RuntimeError("Feature store has not been loaded.")
+        return cls._version
+
+    @classmethod
+    def get_profiles(cls, customer_ids: Iterable[int]) -> Tuple[List[ProfileData], List[int]]:
+        """Returns the precomputed profiles for the given customers, and the IDs that were not found."""
+        if cls._version is None:
+            raise RuntimeError("Feature store has not been loaded.")
+
+        profiles, missing = [], []
+        for customer_id in customer_ids:
+            profile = cls._profiles.get(customer_id)
+            if profile is None:
+                missing.append(customer_id)
+            else:
+                profiles.append(profile)
+        return profiles, missing
+
     @classmethod
     def get_spending_deviation(cls, customer_id: int, transaction_amount: float) -> float:
         """Calculates the spending deviation (Z-score) for a transaction."""
@@ -87,4 +253,40 @@ class FeatureStore:
             return cls._customer_df.loc[customer_id].to_dict()
         except KeyError:
             # For a new customer, return an empty dict. The model logic will handle defaults
-            return {}
\ No newline at end of file
+            return {}
+
+    @classmethod
+    def _get_asof_index(cls) -> AsOfFeatureIndex:
+        """Returns the as-of index, building it from the full feature history on first use."""
+        if cls._asof_index is None:
+            with cls._asof_lock:
+                if cls._asof_index is None:
+                    if cls._store_path is None:
+                        raise RuntimeError("Feature store has not been loaded.")
+                    logger.info(f"Building the as-of feature index from {cls._store_path}...")
+                    cls._asof_index = AsOfFeatureIndex.from_frame(pd.read_parquet(cls._store_path))
+        return cls._asof_index
+
+    @classmethod
+    def get_features_as_of(cls, customer_id: int, timestamp: Any) -> Dict[str, float]:
+        """
+        Retrieves the features a customer had as of `timestamp`, i.e. those of their
+        last transaction at or before it. Returns an empty dict if there is none.
+        """
+        index = cls._get_asof_index()
+        row = index.locate(customer_id, timestamp)
+        if row < 0:
+            return {}
+        return dict(zip(index.columns, index.values[row].tolist()))
+
+    @classmethod
+    def get_features_as_of_bulk(cls, customer_ids: Sequence[int], timestamps: Any) -> pd.DataFrame:
+        """
+        Point-in-time lookup for many (customer, timestamp) pairs at once. Returns one
+        row per pair, in input order, with NaN features where no history exists.
+        """
+        index = cls._get_asof_index()
+        rows = index.locate_bulk(customer_ids, timestamps)
+        values = index.values[np.maximum(rows, 0)]
+        values[rows < 0] = np.nan
+        return pd.DataFrame(values, columns=index.columns)
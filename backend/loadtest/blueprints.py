@@ -0,0 +1,60 @@
+"""Strategy blueprints used by the load generator, mirroring what the frontend sends."""
+
+def _node(node_id: str, node_type: str, label: str, kind: str, **data) -> dict:
+    return {"id": node_id, "type": node_type, "position": {"x": 0, "y": 0}, "data": {"label": label, "type": kind, **data}}
+
+def _edge(edge_id: str, source: str, target: str, source_handle: str | None = None) -> dict:
+    return {"id": edge_id, "source": source, "target": target, "sourceHandle": source_handle}
+
+# The canvas the frontend starts with (frontend/src/lib/default-layout.ts)
+DEFAULT_STRATEGY = {
+    "nodes": [
+        _node("node-1", "strategyNode", "Transaction Stream", "Input"),
+        _node("node-2", "strategyNode", "Spending Deviation", "Feature"),
+        _node("node-3", "strategyNode", "Velocity Counter (24h)", "Feature"),
+        _node("node-4", "strategyNode", "Terminal Risk Score", "Feature"),
+        _node("node-5", "ruleNode", "Amount Gate", "Rule", value=50),
+        _node("node-6", "modelNode", "XGBoost Model", "Model"),
+        _node("node-7", "ruleNode", "Threshold Gate", "Rule", value=0.75),
+        _node("node-8", "logicNode", "AND Gate", "Logic"),
+        _node("node-9", "strategyNode", "APPROVE", "Action"),
+        _node("node-10", "strategyNode", "BLOCK", "Action"),
+        _node("node-11", "strategyNode", "REVIEW", "Action"),
+    ],
+    "edges": [
+        _edge("edge-1", "node-1", "node-2"),
+        _edge("edge-2", "node-1", "node-3"),
+        _edge("edge-3", "node-1", "node-4"),
+        _edge("edge-4", "node-1", "node-5"),
+        _edge("edge-5", "node-2", "node-6"),
+        _edge("edge-6", "node-3", "node-6"),
+        _edge("edge-7", "node-4", "node-6"),
+        _edge("edge-8", "node-6", "node-7"),
+        _edge("edge-9", "node-7", "node-9", "false"),
+        _edge("edge-10", "node-7", "node-8", "true"),
+        _edge("edge-11", "node-5", "node-8", "true"),
+        _edge("edge-12", "node-8", "node-10", "true"),
+        _edge("edge-13", "node-8", "node-11", "false"),
+    ],
+}
+
+# A rules-only strategy, as built by users who have not added the model yet
+RULES_ONLY_STRATEGY = {
+    "nodes": [
+        _node("node-1", "strategyNode", "Transaction Stream", "Input"),
+        _node("node-5", "ruleNode", "Amount Gate", "Rule", value=200),
+        _node("node-9", "strategyNode", "APPROVE", "Action"),
+        _node("node-10", "strategyNode", "BLOCK", "Action"),
+    ],
+    "edges": [
+        _edge("edge-4", "node-1", "node-5"),
+        _edge("edge-12", "node-5", "node-10", "true"),
+        _edge("edge-13", "node-5", "node-9", "false"),
+    ],
+}
+
+# Relative share of virtual users running each strategy
+STRATEGY_MIX = [
+    (DEFAULT_STRATEGY, 0.8),
+    (RULES_ONLY_STRATEGY, 0.2),
+]
@@ -0,0 +1,267 @@
+"""
+Replays the frontend's simulation traffic against a running API.
+
+Each virtual user behaves like a browser running `SimulationManager`: it prefetches
+transactions with `/transactions/batch`, loads the profiles of their customers with
+one bulk `/profiles` request in the background (skipping customers already in its
+profile cache), then posts each queued transaction to `/strategy/execute` with its
+blueprint.
+
+Closed loop: N virtual users, each starting its next session a think time after
+the previous one finished (the browser's 10 ms loop).
+Open loop: sessions arrive as a Poisson process at a target rate, regardless of
+how fast the server answers, which is what reveals the saturation point. Arrivals
+are spread over N simulated browsers, each with its own transaction queue.
+
+Example, against `python -m loadtest.local_server`:
+    python -m loadtest.load_generator --mode closed --users 50 --duration 60
+    python -m loadtest.load_generator --mode open --rate 200 --duration 60 --output report.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from .blueprints import STRATEGY_MIX
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# httpx logs every request at INFO, which would drown the interval reports
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+BATCH_ENDPOINT = "GET /transactions/batch"
+PROFILES_ENDPOINT = "GET /profiles"
+EXECUTE_ENDPOINT = "POST /strategy/execute"
+# Must match TRANSACTION_PREFETCH in SimulationManager.tsx and MAX_CACHED_PROFILES in api.ts
+TRANSACTION_PREFETCH = 20
+MAX_CACHED_PROFILES = 1000
+
+
+class LatencyRecorder:
+    """Collects request outcomes into fixed reporting intervals, per endpoint."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started = time.perf_counter()
+        # interval index -> endpoint -> latencies (ms) / error count
+        self._latencies: Dict[int, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+        self._errors: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.skipped_arrivals = 0
+
+    def record(self, endpoint: str, started: float, latency_ms: float, ok: bool):
+        bucket = int((started - self.started) // self.interval)
+        self._latencies[bucket][endpoint].append(latency_ms)
+        if not ok:
+            self._errors[bucket][endpoint] += 1
+
+    @staticmethod
+    def _summarise(latencies: List[float], errors: int, seconds: float) -> Dict[str, float]:
+        values = np.asarray(latencies) if latencies else np.zeros(1)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            "requests": len(latencies),
+            "throughput_rps": len(latencies) / seconds if seconds > 0 else 0.0,
+            "error_rate": errors / len(latencies) if latencies else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(values.max()),
+        }
+
+    def interval_report(self, bucket: int) -> Dict[str, Dict[str, float]]:
+        return {
+            endpoint: self._summarise(latencies, self._errors[bucket][endpoint], self.interval)
+            for endpoint, latencies in sorted(self._latencies[bucket].items())
+        }
+
+    def summary(self, duration: float) -> Dict[str, Dict[str, float]]:
+        merged: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        for bucket, endpoints in self._latencies.items():
+            for endpoint, latencies in endpoints.items():
+                merged[endpoint].extend(latencies)
+                errors[endpoint] += self._errors[bucket][endpoint]
+        return {endpoint: self._summarise(latencies, errors[endpoint], duration) for endpoint, latencies in sorted(merged.items())}
+
+
+async def timed_request(client: httpx.AsyncClient, recorder: LatencyRecorder, endpoint: str, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        response, ok = None, False
+    recorder.record(endpoint, started, (time.perf_counter() - started) * 1000, ok)
+    return response if ok else None
+
+
+class SimulatedBrowser:
+    """The client-side state of one browser tab: its blueprint, transaction queue and profile cache."""
+
+    def __init__(self, blueprint: dict):
+        self.blueprint = blueprint
+        self.upcoming: List[dict] = []
+        self.profiles: OrderedDict = OrderedDict() # customer IDs with a cached profile, least recently used first
+        self.refill_lock = asyncio.Lock()
+        self.background: set = set()
+
+    def cache_profiles(self, customer_ids: List[int]):
+        for customer_id in customer_ids:
+            self.profiles.pop(customer_id, None)
+            self.profiles[customer_id] = True
+        while len(self.profiles) > MAX_CACHED_PROFILES:
+            self.profiles.popitem(last=False)
+
+    async def drain(self):
+        if self.background:
+            await asyncio.gather(*self.background)
+
+
+async def fetch_profiles(client: httpx.AsyncClient, recorder: LatencyRecorder, browser: SimulatedBrowser, customer_ids: List[int]):
+    response = await timed_request(client, recorder, PROFILES_ENDPOINT, "GET", "/profiles",
+                                   params={"ids": ",".join(map(str, customer_ids))})
+    if response is not None:
+        browser.cache_profiles([int(profile["customerId"]) for profile in response.json()["profiles"]])
+
+
+async def next_transaction(client: httpx.AsyncClient, recorder: LatencyRecorder, browser: SimulatedBrowser) -> dict | None:
+    """Pops the browser's next queued transaction, refilling the queue with one batch request when it is empty."""
+    async with browser.refill_lock:
+        if not browser.upcoming:
+            response = await timed_request(client, recorder, BATCH_ENDPOINT, "GET", "/transactions/batch",
+                                           params={"size": TRANSACTION_PREFETCH})
+            if response is None:
+                return None
+            browser.upcoming = response.json()
+            # Like the frontend, profiles load in the background and are not awaited
+            missing = sorted({tx["id"] for tx in browser.upcoming} - set(browser.profiles))
+            if missing:
+                task = asyncio.create_task(fetch_profiles(client, recorder, browser, missing))
+                browser.background.add(task)
+                task.add_done_callback(browser.background.discard)
+        return browser.upcoming.pop(0) if browser.upcoming else None
+
+
+async def run_session(client: httpx.AsyncClient, recorder: LatencyRecorder, browser: SimulatedBrowser):
+    """One iteration of the frontend simulation loop."""
+    transaction = await next_transaction(client, recorder, browser)
+    if transaction is None:
+        return
+    payload = {"blueprint": browser.blueprint, "transaction": transaction}
+    await timed_request(client, recorder, EXECUTE_ENDPOINT, "POST", "/strategy/execute", json=payload)
+
+
+def pick_blueprint(rng: random.Random) -> dict:
+    blueprints, weights = zip(*STRATEGY_MIX)
+    return rng.choices(blueprints, weights=weights)[0]
+
+
+async def closed_loop(client: httpx.AsyncClient, recorder: LatencyRecorder, browsers: List[SimulatedBrowser], think_time: float, deadline: float):
+    async def virtual_user(browser: SimulatedBrowser):
+        while time.perf_counter() < deadline:
+            await run_session(client, recorder, browser)
+            await asyncio.sleep(think_time)
+
+    await asyncio.gather(*(virtual_user(browser) for browser in browsers))
+
+
+async def open_loop(client: httpx.AsyncClient, recorder: LatencyRecorder, browsers: List[SimulatedBrowser], rate: float, max_in_flight: int,
+                    deadline: float, rng: random.Random):
+    in_flight: set = set()
+    next_arrival = time.perf_counter()
+    arrivals = 0
+    while next_arrival < deadline:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        if len(in_flight) >= max_in_flight:
+            # The client is saturated too; count the arrival instead of silently slowing down
+            recorder.skipped_arrivals += 1
+        else:
+            task = asyncio.create_task(run_session(client, recorder, browsers[arrivals % len(browsers)]))
+            arrivals += 1
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        next_arrival += rng.expovariate(rate)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+async def report_progress(recorder: LatencyRecorder, deadline: float):
+    bucket = 0
+    while True:
+        await asyncio.sleep(recorder.started + (bucket + 1) * recorder.interval - time.perf_counter())
+        for endpoint, stats in recorder.interval_report(bucket).items():
+            logging.info(
+                f"[t={(bucket + 1) * recorder.interval:>5.0f}s] {endpoint:<24} {stats['throughput_rps']:7.1f} req/s  "
+                f"err {stats['error_rate']:6.2%}  p50 {stats['p50_ms']:7.1f} ms  p95 {stats['p95_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms"
+            )
+        bucket += 1
+        if time.perf_counter() >= deadline:
+            return
+
+
+async def run_load_test(args: argparse.Namespace, transport: httpx.AsyncBaseTransport | None = None) -> dict:
+    """Runs the test described by `args`. A `transport` (e.g. httpx.ASGITransport) replaces the network."""
+    rng = random.Random(args.seed)
+    concurrency = args.users if args.mode == "closed" else args.max_in_flight
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    recorder = LatencyRecorder(args.interval)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout, transport=transport) as client:
+        deadline = time.perf_counter() + args.duration
+        browsers = [SimulatedBrowser(pick_blueprint(rng)) for _ in range(args.users)]
+        reporter = asyncio.create_task(report_progress(recorder, deadline))
+        if args.mode == "closed":
+            await closed_loop(client, recorder, browsers, args.think_time, deadline)
+        else:
+            await open_loop(client, recorder, browsers, args.rate, args.max_in_flight, deadline, rng)
+        await asyncio.gather(*(browser.drain() for browser in browsers))
+        reporter.cancel()
+
+    duration = time.perf_counter() - recorder.started
+    n_intervals = int(duration // recorder.interval) + 1
+    return {
+        "config": vars(args),
+        "duration_s": duration,
+        "skipped_arrivals": recorder.skipped_arrivals,
+        "summary": recorder.summary(duration),
+        "intervals": [recorder.interval_report(bucket) for bucket in range(n_intervals)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the frontend simulation traffic against the decision engine API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users (closed loop) or browsers sharing the arrivals (open loop).")
+    parser.add_argument("--think-time", type=float, default=0.01, help="Pause between sessions in seconds (closed loop).")
+    parser.add_argument("--rate", type=float, default=50.0, help="Target sessions per second (open loop).")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Cap on concurrent sessions (open loop).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds.")
+    parser.add_argument("--interval", type=float, default=5.0, help="Reporting interval in seconds.")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Optional path for a JSON report.")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args))
+
+    logging.info(f"Finished after {report['duration_s']:.1f}s ({report['skipped_arrivals']} skipped arrivals).")
+    for endpoint, stats in report["summary"].items():
+        logging.info(
+            f"{endpoint:<24} {stats['requests']} requests  {stats['throughput_rps']:.1f} req/s  err {stats['error_rate']:.2%}  "
+            f"p50 {stats['p50_ms']:.1f} ms  p95 {stats['p95_ms']:.1f} ms  p99 {stats['p99_ms']:.1f} ms"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
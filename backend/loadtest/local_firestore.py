@@ -0,0 +1,61 @@
+import threading
+from typing import Any, Dict
+
+from google.cloud.firestore_v1.transforms import Increment
+
+
+class LocalDocumentSnapshot:
+    """Mimics the parts of a Firestore DocumentSnapshot used by the engine."""
+
+    def __init__(self, data: Dict[str, Any] | None):
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Dict[str, Any] | None:
+        return dict(self._data) if self._data is not None else None
+
+
+class LocalDocumentReference:
+    """An in-memory document supporting get() and set(), including merges and Increment transforms."""
+
+    def __init__(self):
+        self._data: Dict[str, Any] | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> LocalDocumentSnapshot:
+        with self._lock:
+            return LocalDocumentSnapshot(self._data)
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False):
+        with self._lock:
+            current = dict(self._data or {}) if merge else {}
+            for field, value in document_data.items():
+                if isinstance(value, Increment):
+                    current[field] = current.get(field, 0) + value.value
+                else:
+                    current[field] = value
+            self._data = current
+
+
+class LocalCollectionReference:
+    def __init__(self):
+        self._documents: Dict[str, LocalDocumentReference] = {}
+
+    def document(self, document_id: str) -> LocalDocumentReference:
+        return self._documents.setdefault(document_id, LocalDocumentReference())
+
+
+class LocalFirestoreClient:
+    """
+    A process-local stand-in for `google.cloud.firestore.Client`, so the app can
+    run under load without credentials or network round-trips to Firestore.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._collections: Dict[str, LocalCollectionReference] = {}
+
+    def collection(self, collection_id: str) -> LocalCollectionReference:
+        return self._collections.setdefault(collection_id, LocalCollectionReference())
@@ -0,0 +1,34 @@
+"""
+Starts the API locally with Firestore replaced by an in-memory stand-in.
+
+Run from the backend directory:
+    python -m loadtest.local_server --port 8080 --workers 2
+"""
+import argparse
+import logging
+
+import uvicorn
+
+from app.engine import set_firestore_client
+from app.main import app
+from .local_firestore import LocalFirestoreClient
+
+# Uvicorn workers import `app` from this module, so each gets the stand-in too
+set_firestore_client(LocalFirestoreClient())
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the decision engine API against a local Firestore stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=1, help="Uvicorn worker processes, each with its own stand-in.")
+    args = parser.parse_args()
+
+    logging.info("Starting the API with the in-memory Firestore stand-in.")
+    uvicorn.run("loadtest.local_server:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import pandas as pd
+import json
 import os
 import logging
 from datetime import datetime, timedelta
@@ -45,6 +46,40 @@ def load_and_consolidate_data(raw_data_path: str, output_path: str, days_to_load
     consolidated_df.to_parquet(output_path, index=False)
     logging.info(f"Consolidated data saved to {output_path}")
 
+def load_decision_log(log_path: str, start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+    """
+    Loads the decision log written by the backend, one row per decision, for
+    backtesting and retraining. The features each strategy's nodes attached and the
+    vector its model scored (under the model's feature names, NaN when no model ran)
+    are expanded into columns, and node timings are decoded into dicts.
+
+    Args:
+        log_path (str): The decision log directory (partitioned by date=YYYY-MM-DD).
+        start_date (str): First day to load, inclusive, as YYYY-MM-DD. Defaults to the first day logged.
+        end_date (str): Last day to load, inclusive, as YYYY-MM-DD. Defaults to the last day logged.
+    """
+    filters = []
+    if start_date:
+        filters.append(('date', '>=', start_date))
+    if end_date:
+        filters.append(('date', '<=', end_date))
+
+    if not os.path.isdir(log_path):
+        logging.error(f"Decision log directory {log_path} not found.")
+        return pd.DataFrame()
+
+    # Files still being written are hidden (dot-prefixed), so only complete files are read
+    df = pd.read_parquet(log_path, filters=filters or None)
+    logging.info(f"Loaded {len(df)} decisions from {log_path}.")
+    if df.empty:
+        return df
+
+    df['date'] = df['date'].astype(str)
+    features = pd.DataFrame([json.loads(f) for f in df['features']], index=df.index)
+    model_input = pd.DataFrame([json.loads(m) if isinstance(m, str) else {} for m in df['model_input']], index=df.index)
+    df['node_timings_ms'] = df['node_timings_ms'].map(json.loads)
+    return pd.concat([df.drop(columns=['features', 'model_input']), features, model_input], axis=1)
+
 if __name__ == "__main__":
     RAW_DATA_PATH = '../../simulated-data-raw/'
     CONSOLIDATED_DATA_PATH = '../../data/consolidated_transactions.parquet'
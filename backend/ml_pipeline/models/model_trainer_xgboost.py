@@ -2,10 +2,15 @@ import pandas as pd
 import xgboost as xgb
 import joblib
 import logging
+# Works both as a script run from this directory and as ml_pipeline.models.<module>
+try:
+    from .reference_sketch import build_reference_sketch, save_reference_sketch
+except ImportError:
+    from reference_sketch import build_reference_sketch, save_reference_sketch
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def train_xgb_model(feature_store_path: str, model_output_path: str):
+def train_xgb_model(feature_store_path: str, model_output_path: str, reference_output_path: str):
     logging.info("Starting XGBoost model training...")
     df = pd.read_parquet(feature_store_path)
     df['TX_DATETIME'] = pd.to_datetime(df['TX_DATETIME'])
@@ -44,7 +49,14 @@ def train_xgb_model(feature_store_path: str, model_output_path: str):
     joblib.dump(model, model_output_path)
     logging.info(f"Model saved to {model_output_path}")
 
+    # Reference distributions for drift monitoring in the serving API. Scores come from
+    # the days after the split, which the model has not seen
+    X_unseen = df.loc[df['TX_DATETIME'] >= split_date, features]
+    sketch = build_reference_sketch(X_train, model.predict_proba(X_unseen)[:, 1] if len(X_unseen) else None)
+    save_reference_sketch(sketch, reference_output_path)
+
 if __name__ == "__main__":
     FEATURE_STORE_PATH = '../../data/feature_store.parquet'
     MODEL_OUTPUT_PATH = '../../models/xgboost_v1.joblib'
-    train_xgb_model(FEATURE_STORE_PATH, MODEL_OUTPUT_PATH)
\ No newline at end of file
+    REFERENCE_OUTPUT_PATH = '../../models/xgboost_v1_reference.json'
+    train_xgb_model(FEATURE_STORE_PATH, MODEL_OUTPUT_PATH, REFERENCE_OUTPUT_PATH)
\ No newline at end of file
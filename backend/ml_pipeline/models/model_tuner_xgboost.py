@@ -0,0 +1,365 @@
+import pandas as pd
+import numpy as np
+import xgboost as xgb
+import joblib
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Tuple
+from sklearn.metrics import average_precision_score
+# Works both as a script run from this directory and as ml_pipeline.models.<module>
+try:
+    from .reference_sketch import build_reference_sketch, save_reference_sketch
+except ImportError:
+    from reference_sketch import build_reference_sketch, save_reference_sketch
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FEATURES = [
+    'TX_AMOUNT', 'TX_DURING_WEEKEND', 'HourOfDay',
+    'CUSTOMER_ID_NB_TX_1H', 'CUSTOMER_ID_NB_TX_24H', 'CUSTOMER_ID_NB_TX_7D',
+    'CUSTOMER_ID_AMOUNT_ZSCORE_30D', 'CUSTOMER_ID_TIME_SINCE_LAST_TX',
+    'TERMINAL_ID_RISK_30D', 'CUSTOMER_ID_TERMINAL_ID_NB_TX_30D'
+]
+TARGET = 'TX_FRAUD'
+
+# Candidate values for the random search. The first trial is always the
+# configuration of model_trainer_xgboost.py, trained like it for a fixed number of
+# rounds without early stopping, so it is compared with the model it would replace.
+BASELINE_PARAMS = {'max_depth': 6, 'learning_rate': 0.3, 'min_child_weight': 1, 'subsample': 1.0, 'colsample_bytree': 1.0, 'reg_lambda': 1.0}
+BASELINE_ROUNDS = 200
+PARAM_SPACE = {
+    'max_depth': [3, 4, 6, 8],
+    'learning_rate': [0.03, 0.05, 0.1, 0.2, 0.3],
+    'min_child_weight': [1, 5, 10],
+    'subsample': [0.6, 0.8, 1.0],
+    'colsample_bytree': [0.6, 0.8, 1.0],
+    'reg_lambda': [0.5, 1.0, 5.0],
+}
+
+# Set in each worker process by _init_worker
+_X: np.ndarray | None = None
+_X_binned: np.ndarray | None = None
+_y: np.ndarray | None = None
+_days: np.ndarray | None = None
+_fold_matrices: Dict[Tuple, Tuple[xgb.QuantileDMatrix, xgb.QuantileDMatrix, float]] = {}
+
+
+def build_feature_matrix(feature_store_path: str, cache_dir: str) -> str:
+    """
+    Loads the feature store once and saves the feature matrix, labels and day index
+    as .npy files that every worker memory-maps, so the parquet is never re-read and
+    the matrix is shared through the page cache instead of copied per process.
+    Returns a fingerprint of the data, used to key cached fold results.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(feature_store_path)
+    fingerprint = hashlib.sha1(f"{os.path.abspath(feature_store_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+    fingerprint_path = os.path.join(cache_dir, 'fingerprint.txt')
+
+    if os.path.exists(fingerprint_path):
+        with open(fingerprint_path) as f:
+            if f.read() == fingerprint:
+                logging.info("Reusing cached feature matrix.")
+                return fingerprint
+
+    logging.info(f"Building feature matrix from {feature_store_path}...")
+    df = pd.read_parquet(feature_store_path, columns=FEATURES + [TARGET, 'TX_DATETIME'])
+    df['TX_DATETIME'] = pd.to_datetime(df['TX_DATETIME'])
+    df = df.sort_values('TX_DATETIME').reset_index(drop=True)
+
+    days = (df['TX_DATETIME'] - df['TX_DATETIME'].min().normalize()).dt.days.to_numpy(dtype=np.int32)
+    np.save(os.path.join(cache_dir, 'X.npy'), df[FEATURES].to_numpy(dtype=np.float32))
+    np.save(os.path.join(cache_dir, 'y.npy'), df[TARGET].to_numpy(dtype=np.int8))
+    np.save(os.path.join(cache_dir, 'days.npy'), days)
+    with open(fingerprint_path, 'w') as f:
+        f.write(fingerprint)
+    logging.info(f"Feature matrix saved. Shape: {(len(df), len(FEATURES))}")
+    return fingerprint
+
+
+def quantize_feature_matrix(cache_dir: str, fingerprint: str, cut_days: int, max_bin: int):
+    """
+    Quantizes the feature matrix once, in the parent process, and saves each value as
+    the index of its histogram bin. The bin edges are XGBoost's own quantile cuts,
+    fitted on the days before `cut_days` so the holdout never shapes them; later
+    values fall into the outer bins.
+
+    XGBoost cannot share a binned matrix between processes, so workers still wrap
+    their slices in a QuantileDMatrix. With at most `max_bin` distinct codes per
+    feature that step is an exact, cheap pass that keeps every code in its own bin,
+    and every fold trains on the same shared cuts instead of re-sketching the raw
+    values per worker and fold.
+    """
+    spec_path = os.path.join(cache_dir, 'X_binned.json')
+    spec = {'data': fingerprint, 'cut_days': cut_days, 'max_bin': max_bin}
+    if os.path.exists(spec_path):
+        with open(spec_path) as f:
+            if json.load(f) == spec:
+                logging.info("Reusing cached quantized feature matrix.")
+                return
+
+    logging.info(f"Quantizing the feature matrix into at most {max_bin} bins per feature...")
+    X = np.load(os.path.join(cache_dir, 'X.npy'), mmap_mode='r')
+    days = np.load(os.path.join(cache_dir, 'days.npy'), mmap_mode='r')
+    indptr, cuts = xgb.QuantileDMatrix(X[np.asarray(days) < cut_days], max_bin=max_bin).get_quantile_cut()
+    binned = np.full(X.shape, np.nan, dtype=np.float32)
+    for j in range(X.shape[1]):
+        # The first cut of each feature is a lower sentinel; the rest are bin upper bounds
+        upper = cuts[indptr[j] + 1:indptr[j + 1]]
+        column = np.asarray(X[:, j])
+        present = ~np.isnan(column)
+        binned[present, j] = np.minimum(np.searchsorted(upper, column[present], side='right'), len(upper) - 1)
+    np.save(os.path.join(cache_dir, 'X_binned.npy'), binned)
+    with open(spec_path, 'w') as f:
+        json.dump(spec, f)
+
+
+def make_temporal_folds(n_days: int, n_folds: int, valid_days: int, gap_days: int) -> List[Tuple[int, int, int]]:
+    """
+    Rolling-origin folds as (train_end, valid_start, valid_end) day offsets. Each fold
+    trains on every day before its origin and validates on the `valid_days` after a
+    `gap_days` delay, mirroring the feedback delay before fraud labels are known.
+    The last fold ends on the last day of data.
+    """
+    folds = []
+    for k in range(n_folds):
+        valid_end = n_days - (n_folds - 1 - k) * valid_days
+        valid_start = valid_end - valid_days
+        train_end = valid_start - gap_days
+        if train_end <= 0:
+            raise ValueError(f"Not enough days ({n_days}) for {n_folds} folds of {valid_days} days with a {gap_days}-day gap.")
+        folds.append((train_end, valid_start, valid_end))
+    return folds
+
+
+def sample_trials(n_trials: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    trials = [dict(BASELINE_PARAMS)]
+    seen = {json.dumps(BASELINE_PARAMS, sort_keys=True)}
+    # Bounded so a small search space cannot loop forever
+    for _ in range(n_trials * 20):
+        if len(trials) >= n_trials:
+            break
+        params = {name: rng.choice(values) for name, values in PARAM_SPACE.items()}
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            trials.append(params)
+    return trials
+
+
+def _init_worker(cache_dir: str):
+    global _X, _X_binned, _y, _days
+    _X = np.load(os.path.join(cache_dir, 'X.npy'), mmap_mode='r')
+    _X_binned = np.load(os.path.join(cache_dir, 'X_binned.npy'), mmap_mode='r')
+    _y = np.load(os.path.join(cache_dir, 'y.npy'), mmap_mode='r')
+    _days = np.load(os.path.join(cache_dir, 'days.npy'), mmap_mode='r')
+
+
+def _get_fold_matrices(fold: Tuple[int, int, int], max_bin: int) -> Tuple[xgb.QuantileDMatrix, xgb.QuantileDMatrix, float]:
+    """
+    Slices a fold out of the shared quantized matrix once per worker; later trials on
+    the same fold reuse it.
+    """
+    key = (fold, max_bin)
+    if key not in _fold_matrices:
+        train_end, valid_start, valid_end = fold
+        train_mask = _days < train_end
+        valid_mask = (_days >= valid_start) & (_days < valid_end)
+        y_train = _y[train_mask]
+        dtrain = xgb.QuantileDMatrix(_X_binned[train_mask], label=y_train, max_bin=max_bin, feature_names=FEATURES)
+        dvalid = xgb.QuantileDMatrix(_X_binned[valid_mask], label=_y[valid_mask], ref=dtrain, max_bin=max_bin, feature_names=FEATURES)
+        scale_pos_weight = float((y_train == 0).sum() / max((y_train == 1).sum(), 1))
+        _fold_matrices[key] = (dtrain, dvalid, scale_pos_weight)
+    return _fold_matrices[key]
+
+
+def evaluate_fold(params: Dict[str, Any], fold: Tuple[int, int, int], settings: Dict[str, Any],
+                  fixed_rounds: int | None = None) -> Dict[str, Any]:
+    """
+    Trains one configuration on one fold with early stopping on validation AUCPR,
+    or for exactly `fixed_rounds` rounds when given (the baseline).
+    """
+    started = time.time()
+    dtrain, dvalid, scale_pos_weight = _get_fold_matrices(fold, settings['max_bin'])
+    history: Dict[str, Dict[str, List[float]]] = {}
+    booster = xgb.train(
+        {**params, 'objective': 'binary:logistic', 'eval_metric': 'aucpr', 'tree_method': 'hist',
+         'max_bin': settings['max_bin'], 'scale_pos_weight': scale_pos_weight,
+         'nthread': settings['nthread'], 'seed': 42},
+        dtrain,
+        num_boost_round=fixed_rounds or settings['max_rounds'],
+        evals=[(dvalid, 'valid')],
+        early_stopping_rounds=None if fixed_rounds else settings['early_stopping_rounds'],
+        evals_result=history,
+        verbose_eval=False,
+    )
+    if fixed_rounds:
+        aucpr, best_iteration = history['valid']['aucpr'][-1], fixed_rounds - 1
+    else:
+        aucpr, best_iteration = booster.best_score, booster.best_iteration
+    return {
+        'fold': list(fold),
+        'aucpr': float(aucpr),
+        'best_iteration': int(best_iteration),
+        'seconds': time.time() - started,
+    }
+
+
+def _result_path(results_dir: str, fingerprint: str, params: Dict[str, Any], fold: Tuple[int, int, int], settings: Dict[str, Any],
+                 fixed_rounds: int | None) -> str:
+    spec = json.dumps({'data': fingerprint, 'params': params, 'fold': fold, 'fixed_rounds': fixed_rounds,
+                       'settings': {k: v for k, v in settings.items() if k != 'nthread'}}, sort_keys=True)
+    return os.path.join(results_dir, hashlib.sha1(spec.encode()).hexdigest() + '.json')
+
+
+def _fit_classifier(params: Dict[str, Any], n_estimators: int, X: pd.DataFrame, y: np.ndarray, max_bin: int) -> xgb.XGBClassifier:
+    model = xgb.XGBClassifier(
+        objective='binary:logistic',
+        eval_metric='aucpr',
+        n_estimators=n_estimators,
+        scale_pos_weight=(y == 0).sum() / max((y == 1).sum(), 1),
+        tree_method='hist',
+        max_bin=max_bin,
+        random_state=42,
+        n_jobs=-1,
+        **params
+    )
+    return model.fit(X, y)
+
+
+def tune_xgb_model(feature_store_path: str, model_output_path: str, report_path: str, reference_output_path: str, cache_dir: str,
+                   n_trials: int = 30, n_folds: int = 3, valid_days: int = 7, gap_days: int = 7, holdout_days: int = 7,
+                   n_workers: int | None = None, max_rounds: int = 1000, early_stopping_rounds: int = 50,
+                   max_bin: int = 256, seed: int = 42):
+    """
+    Runs a random hyperparameter search over rolling-origin temporal CV folds in a
+    process pool. Every (trial, fold) result is cached on disk as soon as it finishes,
+    so an interrupted sweep resumes where it stopped.
+
+    The last `holdout_days` days are kept out of the search. The best configuration
+    and the baseline are both refitted on the days before the holdout (less the label
+    delay gap) and scored on it; the better of the two is saved, with a JSON report
+    of every trial.
+    """
+    start_time = time.time()
+    fingerprint = build_feature_matrix(feature_store_path, cache_dir)
+    results_dir = os.path.join(cache_dir, 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    days = np.load(os.path.join(cache_dir, 'days.npy'), mmap_mode='r')
+    n_days = int(days.max()) + 1
+    holdout_start = n_days - holdout_days
+    # The folds only see the days before the holdout
+    folds = make_temporal_folds(holdout_start, n_folds, valid_days, gap_days)
+    trials = sample_trials(n_trials, seed)
+    quantize_feature_matrix(cache_dir, fingerprint, holdout_start, max_bin)
+
+    n_workers = n_workers or min(os.cpu_count() or 1, len(trials) * len(folds))
+    settings = {
+        'max_rounds': max_rounds,
+        'early_stopping_rounds': early_stopping_rounds,
+        'max_bin': max_bin,
+        'cut_days': holdout_start,
+        'nthread': max(1, (os.cpu_count() or 1) // n_workers),
+    }
+    logging.info(f"Searching {len(trials)} configurations x {len(folds)} folds on {n_workers} workers. Folds: {folds}")
+
+    # Collect cached results, and schedule only what is missing
+    fold_results: Dict[int, Dict[Tuple, Dict[str, Any]]] = {i: {} for i in range(len(trials))}
+    pending = []
+    trial_rounds = [BASELINE_ROUNDS if params == BASELINE_PARAMS else None for params in trials]
+    for i, params in enumerate(trials):
+        for fold in folds:
+            path = _result_path(results_dir, fingerprint, params, fold, settings, trial_rounds[i])
+            if os.path.exists(path):
+                with open(path) as f:
+                    fold_results[i][fold] = json.load(f)
+            else:
+                pending.append((i, fold, path))
+    logging.info(f"{len(trials) * len(folds) - len(pending)} fold results loaded from cache, {len(pending)} to run.")
+
+    # Tasks are ordered fold-major so each worker tends to reuse its quantized fold matrices
+    pending.sort(key=lambda task: task[1])
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(cache_dir,)) as pool:
+        futures = {pool.submit(evaluate_fold, trials[i], fold, settings, trial_rounds[i]): (i, fold, path) for i, fold, path in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i, fold, path = futures[future]
+            result = future.result()
+            with open(path + '.tmp', 'w') as f:
+                json.dump(result, f)
+            os.replace(path + '.tmp', path)
+            fold_results[i][fold] = result
+            logging.info(f"[{done}/{len(pending)}] trial {i} fold {fold}: AUCPR {result['aucpr']:.4f} "
+                         f"at {result['best_iteration'] + 1} rounds ({result['seconds']:.1f}s)")
+
+    # --- Pick the best configuration by mean validation AUCPR ---
+    report_trials = []
+    for i, params in enumerate(trials):
+        results = [fold_results[i][fold] for fold in folds]
+        report_trials.append({
+            'params': params,
+            'mean_aucpr': float(np.mean([r['aucpr'] for r in results])),
+            'std_aucpr': float(np.std([r['aucpr'] for r in results])),
+            'n_estimators': int(np.mean([r['best_iteration'] + 1 for r in results])),
+            'folds': results,
+        })
+    report_trials.sort(key=lambda trial: trial['mean_aucpr'], reverse=True)
+    best = report_trials[0]
+    baseline = next(trial for trial in report_trials if trial['params'] == BASELINE_PARAMS)
+    logging.info(f"Best configuration: {best['params']} with mean AUCPR {best['mean_aucpr']:.4f} "
+                 f"(baseline {baseline['mean_aucpr']:.4f})")
+
+    # --- Refit the best configuration and the baseline, and compare them on the holdout ---
+    _init_worker(cache_dir)
+    train_mask = np.asarray(_days) < holdout_start - gap_days
+    holdout_mask = np.asarray(_days) >= holdout_start
+    X_train = pd.DataFrame(np.asarray(_X)[train_mask], columns=FEATURES)
+    y_train = np.asarray(_y)[train_mask]
+    X_holdout = pd.DataFrame(np.asarray(_X)[holdout_mask], columns=FEATURES)
+    y_holdout = np.asarray(_y)[holdout_mask]
+
+    logging.info(f"Refitting on days [0, {holdout_start - gap_days}) and scoring on the holdout days [{holdout_start}, {n_days})...")
+    candidates = {
+        'best': _fit_classifier(best['params'], best['n_estimators'], X_train, y_train, max_bin),
+        'baseline': _fit_classifier(BASELINE_PARAMS, BASELINE_ROUNDS, X_train, y_train, max_bin),
+    }
+    holdout = {name: float(average_precision_score(y_holdout, model.predict_proba(X_holdout)[:, 1]))
+               for name, model in candidates.items()}
+    chosen = 'best' if holdout['best'] >= holdout['baseline'] else 'baseline'
+    logging.info(f"Holdout AUCPR: best {holdout['best']:.4f}, baseline {holdout['baseline']:.4f}. Saving the {chosen} model.")
+
+    model = candidates[chosen]
+    joblib.dump(model, model_output_path)
+    logging.info(f"Model saved to {model_output_path}")
+
+    # Reference distributions for drift monitoring in the serving API, with scores from the unseen holdout
+    save_reference_sketch(build_reference_sketch(X_train, model.predict_proba(X_holdout)[:, 1]), reference_output_path)
+
+    report = {
+        'feature_store': feature_store_path,
+        'folds': folds,
+        'holdout': {'days': [holdout_start, n_days], 'aucpr': holdout, 'saved': chosen},
+        'settings': settings,
+        'best': best,
+        'baseline': baseline,
+        'trials': report_trials,
+        'total_seconds': time.time() - start_time,
+    }
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Report saved to {report_path}. Total time: {report['total_seconds']:.2f} seconds")
+
+
+if __name__ == "__main__":
+    FEATURE_STORE_PATH = '../../data/feature_store.parquet'
+    MODEL_OUTPUT_PATH = '../../models/xgboost_v1.joblib'
+    REPORT_PATH = '../../models/xgboost_v1_tuning_report.json'
+    REFERENCE_OUTPUT_PATH = '../../models/xgboost_v1_reference.json'
+    CACHE_DIR = '../../data/xgb_tuning_cache'
+    tune_xgb_model(FEATURE_STORE_PATH, MODEL_OUTPUT_PATH, REPORT_PATH, REFERENCE_OUTPUT_PATH, CACHE_DIR)
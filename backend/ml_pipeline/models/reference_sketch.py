@@ -0,0 +1,85 @@
+import pandas as pd
+import numpy as np
+import json
+import logging
+import math
+
+# Must match MODEL_SCORE and the quantile sketch grid in app/drift.py
+MODEL_SCORE = 'MODEL_SCORE'
+SKETCH_RELATIVE_ACCURACY = 0.05
+SKETCH_MIN_MAGNITUDE = 1e-3
+SKETCH_MAX_MAGNITUDE = 1e7
+
+def sketch_index(values: np.ndarray) -> np.ndarray:
+    """Maps values to their buckets on the serving side's logarithmic quantile sketch grid."""
+    log_gamma = math.log((1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY))
+    per_sign = math.ceil(math.log(SKETCH_MAX_MAGNITUDE / SKETCH_MIN_MAGNITUDE) / log_gamma)
+    magnitude = np.abs(values)
+    k = np.ceil(np.log(np.maximum(magnitude, SKETCH_MIN_MAGNITUDE) / SKETCH_MIN_MAGNITUDE) / log_gamma)
+    k = np.where(magnitude < SKETCH_MIN_MAGNITUDE, 0, np.clip(k, 1, per_sign)).astype(np.int64)
+    return per_sign + np.where(values < 0, -k, k)
+
+def build_reference_sketch(X: pd.DataFrame, scores: np.ndarray | None, n_bins: int = 20) -> dict:
+    """
+    Summarises the training distribution of every model feature, and of the model's
+    own scores, as quantile bin edges plus the share of rows in each bin. `scores`
+    must come from rows the model was not trained on: scores on its training rows are
+    overfit and more extreme than live ones, so they would flag healthy traffic as
+    drifted. Without scores, the model score is not monitored. The serving
+    side bins live traffic on the same edges to compute PSI. Exact p50/p95 and counts
+    on the serving side's quantile sketch grid (sparse [bucket, count] pairs) are kept
+    for comparing quantiles and computing KS.
+
+    With m interior edges there are m + 1 bins: (-inf, e1), [e1, e2), ..., [em, inf).
+    """
+    columns = {name: X[name].fillna(0).to_numpy(dtype=np.float64) for name in X.columns}
+    if scores is not None and len(scores) > 0:
+        columns[MODEL_SCORE] = np.asarray(scores, dtype=np.float64)
+    else:
+        logging.warning("No out-of-sample scores given; the model score will not be monitored for drift.")
+
+    features = {}
+    for name, values in columns.items():
+        # Interior quantiles; discrete features collapse to fewer unique edges
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        sketch_buckets, sketch_counts = np.unique(sketch_index(values), return_counts=True)
+        features[name] = {
+            'edges': edges.tolist(),
+            'proportions': (counts / counts.sum()).tolist(),
+            'count': int(counts.sum()),
+            'quantiles': {'p50': float(np.quantile(values, 0.5)), 'p95': float(np.quantile(values, 0.95))},
+            'sketch': np.column_stack([sketch_buckets, sketch_counts]).tolist(),
+        }
+    sketch_params = {'relative_accuracy': SKETCH_RELATIVE_ACCURACY, 'min_magnitude': SKETCH_MIN_MAGNITUDE, 'max_magnitude': SKETCH_MAX_MAGNITUDE}
+    return {'version': 2, 'n_bins': n_bins, 'sketch_params': sketch_params, 'features': features}
+
+def save_reference_sketch(sketch: dict, output_path: str):
+    with open(output_path, 'w') as f:
+        json.dump(sketch, f)
+    logging.info(f"Reference sketch saved to {output_path}")
+
+def build_reference_for_model(feature_store_path: str, model_path: str, output_path: str, train_days: int = 21):
+    """
+    Builds the reference sketch for an already trained model, without retraining it.
+    Features are summarised over the same training window as model_trainer_xgboost.py
+    (the first `train_days` days) and scores over the days after it.
+    """
+    import joblib
+    model = joblib.load(model_path)
+    features = list(model.feature_names_in_)
+
+    df = pd.read_parquet(feature_store_path, columns=features + ['TX_DATETIME'])
+    df['TX_DATETIME'] = pd.to_datetime(df['TX_DATETIME'])
+    in_train = df['TX_DATETIME'] < df['TX_DATETIME'].min() + pd.Timedelta(days=train_days)
+    X_train, X_unseen = df.loc[in_train, features], df.loc[~in_train, features]
+    scores = model.predict_proba(X_unseen)[:, 1] if len(X_unseen) else None
+
+    save_reference_sketch(build_reference_sketch(X_train, scores), output_path)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    FEATURE_STORE_PATH = '../../data/feature_store.parquet'
+    MODEL_PATH = '../../models/xgboost_v1.joblib'
+    REFERENCE_OUTPUT_PATH = '../../models/xgboost_v1_reference.json'
+    build_reference_for_model(FEATURE_STORE_PATH, MODEL_PATH, REFERENCE_OUTPUT_PATH)
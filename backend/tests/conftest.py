@@ -0,0 +1,73 @@
+import pytest
+from app.engine import set_firestore_client
+from loadtest.local_firestore import LocalFirestoreClient
+
+@pytest.fixture(autouse=True)
+def local_firestore():
+    """Replaces Firestore with an in-memory stand-in so tests need no credentials."""
+    set_firestore_client(LocalFirestoreClient())
+    yield
+    set_firestore_client(None)
+
+@pytest.fixture(autouse=True)
+def decision_log_dir(tmp_path, monkeypatch):
+    """Keeps decision logs written by the app during tests out of the source tree."""
+    from app import main
+    monkeypatch.setattr(main, "DECISION_LOG_DIR", tmp_path / "decision_log")
+    return tmp_path / "decision_log"
+
+@pytest.fixture
+def loaded_feature_store():
+    """Loads a tiny in-memory feature store instead of the Parquet file."""
+    import pandas as pd
+    from app.services import FeatureStore
+
+    FeatureStore._customer_df = pd.DataFrame({
+        "CUSTOMER_ID": [1, 2],
+        "TRANSACTION_ID": [1001, 1002],
+        "TERMINAL_ID": [101, 202],
+        "TX_AMOUNT": [10.0, 20.0],
+        "TX_FRAUD": [0, 1],
+        "CUSTOMER_ID_AVG_AMOUNT_30D": [12.5, 40.0],
+    }).set_index("CUSTOMER_ID")
+    FeatureStore._build_profiles()
+    yield FeatureStore
+    FeatureStore._customer_df = None
+    FeatureStore._profiles = {}
+    FeatureStore._version = None
+
+class FakeModel:
+    """Stands in for the XGBoost model, always predicting the same fraud probability."""
+    def predict_proba(self, X):
+        return [[0.2, 0.8]]
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    from app.services import ModelLoader
+    monkeypatch.setattr(ModelLoader, "_model", FakeModel())
+    return ModelLoader._model
+
+@pytest.fixture
+def make_blueprint():
+    """Builds an input -> feature -> model -> threshold gate strategy, blocking at or above the threshold."""
+    from app.schemas import StrategyBlueprint
+
+    def make(threshold: float) -> StrategyBlueprint:
+        return StrategyBlueprint(**{
+            "nodes": [
+                {"id": "in", "type": "strategyNode", "position": {"x": 0, "y": 0}, "data": {"label": "Transaction Stream", "type": "Input"}},
+                {"id": "feat", "type": "strategyNode", "position": {"x": 0, "y": 0}, "data": {"label": "Spending Deviation", "type": "Feature"}},
+                {"id": "model", "type": "modelNode", "position": {"x": 0, "y": 0}, "data": {"label": "XGBoost Model", "type": "Model"}},
+                {"id": "gate", "type": "ruleNode", "position": {"x": 0, "y": 0}, "data": {"label": "Threshold Gate", "type": "Rule", "value": threshold}},
+                {"id": "block", "type": "strategyNode", "position": {"x": 0, "y": 0}, "data": {"label": "BLOCK", "type": "Action"}},
+                {"id": "approve", "type": "strategyNode", "position": {"x": 0, "y": 0}, "data": {"label": "APPROVE", "type": "Action"}},
+            ],
+            "edges": [
+                {"id": "e1", "source": "in", "target": "feat"},
+                {"id": "e2", "source": "feat", "target": "model"},
+                {"id": "e3", "source": "model", "target": "gate"},
+                {"id": "e4", "source": "gate", "sourceHandle": "true", "target": "block"},
+                {"id": "e5", "source": "gate", "sourceHandle": "false", "target": "approve"},
+            ]
+        })
+    return make
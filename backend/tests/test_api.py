@@ -1,6 +1,9 @@
 import pytest
 from httpx import AsyncClient, ASGITransport
-from app.main import app 
+from app import main
+from app.main import app, engine
+from app.lists import ListStore, build_membership_index
+from app.services import ModelLoader
 
 SAMPLE_BLUEPRINT = {
     "nodes": [
@@ -38,4 +41,109 @@ async def test_execute_strategy_block():
     assert result["decision"] == "BLOCK"
     assert "precision" in result
     assert "recall" in result
-    assert len(result["path"]) > 0
\ No newline at end of file
+    assert len(result["path"]) > 0
+
+@pytest.mark.anyio
+async def test_bulk_profiles_are_cacheable(loaded_feature_store):
+    """Tests that bulk profiles report missing IDs and revalidate with a 304."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/profiles", params={"ids": "2,1,99"})
+        cached = await ac.get("/profiles", params={"ids": "1,2,99"}, headers={"If-None-Match": response.headers["ETag"]})
+
+    assert response.status_code == 200
+    assert [p["customerId"] for p in response.json()["profiles"]] == ["1", "2"]
+    assert response.json()["missing"] == [99]
+    assert response.json()["version"] == loaded_feature_store.get_version()
+    assert "max-age" in response.headers["Cache-Control"]
+    assert cached.status_code == 304
+
+@pytest.mark.anyio
+async def test_transaction_batch(loaded_feature_store):
+    """Tests that the simulation can prefetch several transactions in one request."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/transactions/batch", params={"size": 5})
+        too_large = await ac.get("/transactions/batch", params={"size": 1000})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert {(tx["id"], tx["transaction_id"]) for tx in response.json()} <= {(1, 1001), (2, 1002)}
+    assert too_large.status_code == 400
+
+@pytest.mark.anyio
+async def test_lifespan_reports_ready_after_warm_up(loaded_feature_store, fake_model):
+    """Tests that startup warms every node up and only then reports the instance ready."""
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            ready = await ac.get("/ready")
+
+    assert engine.warm_up_failures == []
+    assert ready.status_code == 200
+    assert app.state.ready is False
+
+@pytest.mark.anyio
+async def test_lifespan_is_not_ready_without_a_model(loaded_feature_store, monkeypatch, tmp_path):
+    """Tests that an instance whose model failed to load never reports ready."""
+    monkeypatch.setattr(ModelLoader, "_model", None)
+    monkeypatch.setattr(main, "MODEL_PATH", tmp_path / "missing.joblib")
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            not_ready = await ac.get("/ready")
+
+    assert "XGBoost Model" in engine.warm_up_failures
+    assert not_ready.status_code == 503
+
+@pytest.mark.anyio
+async def test_terminal_blocklist_matches_served_transactions(loaded_feature_store, tmp_path):
+    """Tests that transactions served by the API carry their terminal, and a terminal list blocks on it."""
+    build_membership_index([202], tmp_path, "blocked_terminals", version="v1")
+    ListStore.load_lists(tmp_path)
+    blueprint = {
+        "nodes": [
+            {"id": "in", "type": "strategyNode", "position": {"x": 0, "y": 0}, "data": {"label": "Transaction Stream", "type": "Input"}},
+            {"id": "list", "type": "ruleNode", "position": {"x": 0, "y": 0}, "data": {"label": "List Membership", "type": "Rule", "list": "blocked_terminals", "field": "terminal_id"}},
+            {"id": "block", "type": "strategyNode", "position": {"x": 0, "y": 0}, "data": {"label": "BLOCK", "type": "Action"}},
+            {"id": "approve", "type": "strategyNode", "position": {"x": 0, "y": 0}, "data": {"label": "APPROVE", "type": "Action"}},
+        ],
+        "edges": [
+            {"id": "e1", "source": "in", "target": "list"},
+            {"id": "e2", "source": "list", "sourceHandle": "true", "target": "block"},
+            {"id": "e3", "source": "list", "sourceHandle": "false", "target": "approve"},
+        ]
+    }
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        transactions = (await ac.get("/transactions/batch", params={"size": 20})).json()
+        decisions = {}
+        for transaction in transactions:
+            response = await ac.post("/strategy/execute", json={"blueprint": blueprint, "transaction": transaction})
+            decisions[transaction["terminal_id"]] = response.json()["decision"]
+
+    assert {transaction["id"]: transaction["terminal_id"] for transaction in transactions} == {1: 101, 2: 202}
+    assert decisions == {101: "APPROVE", 202: "BLOCK"}
+
+@pytest.mark.anyio
+async def test_failing_shadow_strategy_does_not_fail_the_champion():
+    """Tests that a broken challenger is reported on its own while the champion's trace is still returned."""
+    broken = {
+        "nodes": SAMPLE_BLUEPRINT["nodes"][:1] + [
+            {"id": "expr", "type": "ruleNode", "position": {"x": 0, "y": 0}, "data": {"label": "Expression Rule", "type": "Rule", "expression": "foo > 1"}},
+        ],
+        "edges": [{"id": "e1", "source": "node-1", "target": "expr"}],
+    }
+    request_payload = {
+        "strategies": {"champion": SAMPLE_BLUEPRINT, "broken": broken},
+        "champion": "champion",
+        # Feature values are arbitrary JSON, including unhashable lists
+        "transaction": {"id": 1, "amount": 100.0, "isFraud": True, "features": {"x": [1, 2]}},
+    }
+    production_before = engine.window_metrics.snapshot("1m")["total"]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/strategy/execute/multi", json=request_payload)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["traces"]["champion"]["decision"] == "BLOCK"
+    assert set(result["traces"]) == {"champion"}
+    assert "foo" in result["failed"]["broken"]
+    assert engine.window_metrics.snapshot("1m")["total"] == production_before + 1
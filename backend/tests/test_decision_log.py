@@ -0,0 +1,108 @@
+import calendar
+import threading
+import time
+import numpy as np
+import pytest
+from app import decision_log
+from app.decision_log import DecisionLog, DecisionRecord
+from app.engine import ExecutionEngine
+from app.logic import registry
+from ml_pipeline.data_prep.data_loader import load_decision_log
+from app.schemas import Transaction
+from app.services import MODEL_FEATURES
+
+def make_record(transaction_id: int, timestamp: float | None = None) -> DecisionRecord:
+    return DecisionRecord(
+        timestamp=time.time() if timestamp is None else timestamp, transaction_id=transaction_id, customer_id=1,
+        strategy_id="production", role="production", decision="BLOCK", is_fraud=True, amount=10.0,
+        model_score=0.9, features={"velocity_24h": 3.0}, model_input=None, path=["in", "block"], total_ms=0.5,
+        node_timings_ms={"in": 0.1},
+    )
+
+def test_engine_logs_production_and_shadow_decisions(tmp_path, mocker, make_blueprint, loaded_feature_store, fake_model):
+    """Tests that champion and shadow decisions, with the scored vector and per-node timings, reach Parquet and load back."""
+    mocker.patch.dict(registry.NODE_LOGIC_REGISTRY, {"Spending Deviation": lambda node, transaction, **kwargs: (None, {})})
+    engine = ExecutionEngine()
+    engine.decision_log.start(tmp_path)
+    # Feature nodes compute with NumPy, so values can arrive as NumPy scalars
+    transaction = Transaction(id=1, transaction_id=1234, amount=50, isFraud=True,
+                              features={"velocity_24h": np.float32(3.0), "nb_tx_7d": np.int64(4)})
+
+    engine.execute_many({"champion": make_blueprint(0.5), "strict": make_blueprint(0.9)}, transaction, "champion")
+    engine.decision_log.stop()
+
+    df = load_decision_log(str(tmp_path)).set_index("strategy_id")
+    assert df.loc["champion", "role"] == "production" and df.loc["champion", "decision"] == "BLOCK"
+    assert df.loc["strict", "role"] == "shadow" and df.loc["strict", "decision"] == "APPROVE"
+    assert df.loc["champion", "model_score"] == 0.8
+    assert df.loc["champion", "transaction_id"] == 1234 and df.loc["champion", "customer_id"] == 1
+    assert df.loc["champion", "velocity_24h"] == 3.0 and df.loc["champion", "nb_tx_7d"] == 4
+    # The full model input is logged, including for the shadow strategy that reused the champion's model run
+    for strategy_id in ["champion", "strict"]:
+        model_input = df.loc[strategy_id, MODEL_FEATURES]
+        assert model_input["TX_AMOUNT"] == 50.0 and model_input["CUSTOMER_ID_NB_TX_24H"] == 3.0
+        assert model_input.notna().all()
+    assert set(df.loc["champion", "node_timings_ms"]) == {"feat", "model", "gate"}
+    assert list(df.loc["champion", "path"]) == ["in", "feat", "model", "gate", "block"]
+
+def test_files_are_partitioned_by_day_and_hidden_until_closed(tmp_path):
+    """Tests that open files are invisible to readers and each day gets its own partition."""
+    log = DecisionLog(flush_seconds=0.01)
+    log.start(tmp_path)
+    log.submit(make_record(1, timestamp=calendar.timegm((2026, 1, 1, 12, 0, 0))))
+    log.submit(make_record(2, timestamp=calendar.timegm((2026, 1, 2, 12, 0, 0))))
+    deadline = time.monotonic() + 5
+    while log.written < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # The day change closed the first file; the second is still being written
+    assert [p.parent.name for p in tmp_path.glob("date=*/*.parquet")] == ["date=2026-01-01"]
+    log.stop()
+
+    assert sorted(p.parent.name for p in tmp_path.glob("date=*/*.parquet")) == ["date=2026-01-01", "date=2026-01-02"]
+    assert load_decision_log(str(tmp_path), start_date="2026-01-02")["transaction_id"].tolist() == [2]
+
+def blocked_writer(log: DecisionLog, mocker) -> tuple[threading.Event, threading.Event]:
+    """Makes the log's writer hang on its first batch, so the queue fills up."""
+    writing, release = threading.Event(), threading.Event()
+    mocker.patch.object(log, "_write_batch", side_effect=lambda batch: (writing.set(), release.wait(5)))
+    return writing, release
+
+def test_drop_policy_never_blocks(tmp_path, mocker):
+    """Tests that a full queue drops records instead of holding up the request."""
+    log = DecisionLog(queue_size=1, batch_size=1, policy="drop")
+    writing, release = blocked_writer(log, mocker)
+    log.start(tmp_path)
+
+    assert log.submit(make_record(1))
+    assert writing.wait(5) # the writer holds record 1
+    assert log.submit(make_record(2)) # fills the queue
+    started = time.monotonic()
+    assert not log.submit(make_record(3))
+    assert time.monotonic() - started < 0.1
+    assert log.dropped == 1
+
+    release.set()
+    log.stop()
+
+def test_block_policy_waits_then_drops(tmp_path, mocker, monkeypatch):
+    """Tests that the block policy waits for room in the queue, up to its timeout."""
+    monkeypatch.setattr(decision_log, "BLOCK_TIMEOUT_SECONDS", 0.2)
+    log = DecisionLog(queue_size=1, batch_size=1, policy="block")
+    writing, release = blocked_writer(log, mocker)
+    log.start(tmp_path)
+
+    assert log.submit(make_record(1)) and writing.wait(5)
+    assert log.submit(make_record(2))
+    started = time.monotonic()
+    assert not log.submit(make_record(3))
+    assert time.monotonic() - started >= 0.2
+    assert log.dropped == 1
+
+    release.set()
+    log.stop()
+
+def test_unknown_policy_is_rejected():
+    """Tests that a misspelt DECISION_LOG_POLICY fails at startup rather than silently dropping."""
+    with pytest.raises(ValueError):
+        DecisionLog(policy="wait")
@@ -0,0 +1,97 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from app import drift
+from app.drift import DriftMonitor, MODEL_SCORE, histogram_quantile, sketch_index, sketch_quantile
+from ml_pipeline.models import reference_sketch
+from ml_pipeline.models.reference_sketch import build_reference_sketch
+
+@pytest.fixture
+def monitor():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"TX_AMOUNT": rng.normal(50, 10, 10_000)})
+    DriftMonitor.configure(build_reference_sketch(X, rng.uniform(size=10_000)))
+    yield DriftMonitor
+    DriftMonitor.configure({"features": {}})
+
+def test_no_drift_for_training_like_traffic(monitor):
+    """Tests that traffic drawn from the training distribution has a near-zero PSI."""
+    rng = np.random.default_rng(1)
+    for amount, score in zip(rng.normal(50, 10, 5_000), rng.uniform(size=5_000)):
+        monitor.observe({"TX_AMOUNT": amount, MODEL_SCORE: score}, now=1000)
+
+    report = {f["feature"]: f for f in monitor.report("1h", now=1000)["features"]}
+
+    assert report["TX_AMOUNT"]["observed"] == 5_000
+    assert report["TX_AMOUNT"]["psi"] < 0.02
+    assert report["TX_AMOUNT"]["p50"] == pytest.approx(50, rel=drift.SKETCH_RELATIVE_ACCURACY)
+    assert report["TX_AMOUNT"]["reference_p50"] == pytest.approx(50, abs=0.5)
+    assert report["TX_AMOUNT"]["ks"] < 0.05
+
+def test_shifted_traffic_is_flagged(monitor):
+    """Tests that a shifted feature gets a large PSI and KS, and old traffic leaves the window."""
+    rng = np.random.default_rng(2)
+    for amount in rng.normal(80, 10, 2_000):
+        monitor.observe({"TX_AMOUNT": amount, MODEL_SCORE: 0.5}, now=1000)
+
+    report = {f["feature"]: f for f in monitor.report("1h", now=1000)["features"]}
+
+    assert report["TX_AMOUNT"]["psi"] > 1.0
+    assert report["TX_AMOUNT"]["ks"] > 0.8
+    assert monitor.report("1m", now=2000)["features"][0]["observed"] == 0
+
+def test_quantiles_follow_traffic_beyond_the_reference_range(monitor):
+    """Tests that served quantiles and KS are not capped at the reference's outermost bin edges."""
+    rng = np.random.default_rng(3)
+    for amount in rng.normal(500, 50, 2_000):
+        monitor.observe({"TX_AMOUNT": amount, MODEL_SCORE: 0.5}, now=1000)
+
+    report = {f["feature"]: f for f in monitor.report("1h", now=1000)["features"]}
+
+    assert report["TX_AMOUNT"]["p50"] == pytest.approx(500, rel=drift.SKETCH_RELATIVE_ACCURACY)
+    assert report["TX_AMOUNT"]["p95"] == pytest.approx(500 + 1.645 * 50, rel=drift.SKETCH_RELATIVE_ACCURACY)
+    assert report["TX_AMOUNT"]["ks"] > 0.99
+
+def test_sketch_quantiles_are_within_the_relative_accuracy():
+    """Tests the sketch on values of both signs and zero, and that the pipeline bins on the same grid."""
+    values = np.concatenate([-np.logspace(-2, 4, 500), np.zeros(10), np.logspace(-2, 4, 500)])
+    counts = np.bincount(sketch_index(values), minlength=drift.SKETCH_WIDTH)
+
+    for q in [0.01, 0.25, 0.75, 0.99]:
+        assert sketch_quantile(counts, q) == pytest.approx(np.quantile(values, q, method="lower"), rel=drift.SKETCH_RELATIVE_ACCURACY)
+    assert sketch_quantile(counts, 0.5) == 0.0
+    assert sketch_quantile(np.zeros(drift.SKETCH_WIDTH), 0.5) is None
+    assert (reference_sketch.sketch_index(values) == sketch_index(values)).all()
+    assert build_reference_sketch(pd.DataFrame({"x": values}), values)["sketch_params"] == drift.sketch_params()
+
+def test_histogram_quantile_interpolates():
+    """Tests quantile estimation within a bin."""
+    assert histogram_quantile(np.array([0.0, 10.0]), np.array([0, 10, 0]), 0.5) == 5.0
+
+def test_reference_sketch_for_an_existing_model(tmp_path):
+    """Tests that a sketch is built from the model's own features over the training window, and scores after it, without retraining."""
+    import joblib
+    import xgboost as xgb
+    from ml_pipeline.models.reference_sketch import build_reference_for_model
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "TX_DATETIME": pd.date_range("2024-01-01", periods=400, freq="3h"),
+        "TX_AMOUNT": rng.normal(50, 10, 400),
+        "TX_FRAUD": rng.integers(0, 2, 400),
+    })
+    df.to_parquet(tmp_path / "feature_store.parquet", index=False)
+    model = xgb.XGBClassifier(n_estimators=5).fit(df[["TX_AMOUNT"]], df["TX_FRAUD"])
+    joblib.dump(model, tmp_path / "model.joblib")
+
+    build_reference_for_model(str(tmp_path / "feature_store.parquet"), str(tmp_path / "model.joblib"), str(tmp_path / "reference.json"))
+
+    with open(tmp_path / "reference.json") as f:
+        counts = {name: feature["count"] for name, feature in json.load(f)["features"].items()}
+    # 21 days of 8 transactions train the model; its scores are summarised on the remaining 232
+    assert counts == {"TX_AMOUNT": 168, MODEL_SCORE: 232}
+
+    DriftMonitor.load_reference(str(tmp_path / "reference.json"))
+    assert DriftMonitor._features == ["TX_AMOUNT", MODEL_SCORE]
+    assert DriftMonitor.report("1h")["features"][0]["observed"] == 0
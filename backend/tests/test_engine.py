@@ -0,0 +1,64 @@
+from app import engine as engine_module
+from app.engine import ExecutionEngine
+from app.logic import registry
+from app.schemas import Transaction
+
+def test_execute_many_shares_features_and_models(mocker, make_blueprint):
+    """Tests that identical feature and model nodes run once across champion and shadow strategies."""
+    calls = {"feature": 0, "model": 0}
+
+    def fake_feature(node, transaction, **kwargs):
+        calls["feature"] += 1
+        transaction.features["spending_deviation"] = 2.0
+        return None, {"Z-Score": "2.0000"}
+
+    def fake_model(node, transaction, **kwargs):
+        calls["model"] += 1
+        transaction.model_score = 0.6
+        return None, {"Predicted Fraud Score": "0.6000"}
+
+    mocker.patch.dict(registry.NODE_LOGIC_REGISTRY, {"Spending Deviation": fake_feature, "XGBoost Model": fake_model})
+    engine = ExecutionEngine()
+    mocker.patch.object(engine, "_record_production", side_effect=lambda decision, *args: decision)
+
+    traces = engine.execute_many(
+        {"champion": make_blueprint(0.8), "challenger": make_blueprint(0.5)},
+        Transaction(id=1, amount=100.0, isFraud=True),
+        champion="champion",
+    ).traces
+
+    assert calls == {"feature": 1, "model": 1}
+    assert traces["champion"] == "APPROVE"
+    assert traces["challenger"].decision == "BLOCK"
+    assert engine.shadow_metrics["challenger"].snapshot("1m")["confusion_matrix"]["true_positives"] == 1
+
+def test_shadow_metrics_evict_least_recently_used(mocker, make_blueprint):
+    """Tests that new challengers keep running once the shadow limit is reached, evicting the oldest stream."""
+    mocker.patch.dict(registry.NODE_LOGIC_REGISTRY, {
+        "Spending Deviation": lambda node, transaction, **kwargs: (None, {}),
+        "XGBoost Model": lambda node, transaction, **kwargs: (None, {}),
+    })
+    mocker.patch.object(engine_module, "MAX_SHADOW_STRATEGIES", 2)
+    engine = ExecutionEngine()
+    mocker.patch.object(engine, "_record_production")
+    transaction = Transaction(id=1, amount=100.0, isFraud=True)
+
+    for challenger in ["a", "b", "a", "c"]:
+        engine.execute_many({"champion": make_blueprint(0.5), challenger: make_blueprint(0.5)}, transaction, "champion")
+
+    assert list(engine.shadow_metrics) == ["a", "c"]
+
+def test_unhashable_features_are_not_shared(mocker, make_blueprint):
+    """Tests that feature values sent as lists run the node per strategy instead of failing the request."""
+    mocker.patch.dict(registry.NODE_LOGIC_REGISTRY, {
+        "Spending Deviation": lambda node, transaction, **kwargs: (None, {}),
+        "XGBoost Model": lambda node, transaction, **kwargs: (None, {}),
+    })
+    engine = ExecutionEngine()
+    mocker.patch.object(engine, "_record_production", side_effect=lambda decision, *args: decision)
+    transaction = Transaction(id=1, amount=100.0, isFraud=True, features={"x": [1, 2]})
+
+    result = engine.execute_many({"champion": make_blueprint(0.5), "challenger": make_blueprint(0.5)}, transaction, "champion")
+
+    assert result.failed == {}
+    assert result.traces["challenger"].decision == "APPROVE"
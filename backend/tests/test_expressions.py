@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from app.schemas import Node, Transaction
+from app.logic._expressions import compile_expression
+from app.logic._rules import expression_rule
+
+def test_expression_rule_uses_features_and_score():
+    """Tests an expression combining the amount, an attached feature and the model score."""
+    mock_node = Node(id="1", type="Rule", data={"expression": "amount > 500 and features.velocity_24h >= 5 or model_score > 0.8"}, position={"x":0, "y":0})
+    mock_transaction = Transaction(id=123, amount=600, isFraud=False, features={"velocity_24h": 7})
+
+    handle, output_data = expression_rule(mock_node, mock_transaction)
+
+    assert handle == 'true'
+    assert output_data["Outcome"] == "TRUE"
+
+def test_expression_missing_values_default_to_zero():
+    """Tests that a missing feature and a missing model score evaluate as 0."""
+    expression = compile_expression("features.velocity_24h >= 5 or model_score > 0.8")
+
+    assert expression.evaluate(Transaction(id=1, amount=10, isFraud=False)) is False
+
+@pytest.mark.parametrize("source", [
+    "__import__('os').system('ls')",
+    "amount.__class__",
+    "customer_id > 1",
+    "amount ** 2 > 1",
+    "'a' == 'a'",
+    "",
+])
+def test_expression_rejects_unsafe_or_unknown_syntax(source):
+    """Tests that only whitelisted fields, literals and operators compile."""
+    with pytest.raises(ValueError):
+        compile_expression(source)
+
+@pytest.mark.parametrize("source", [
+    "(amount > 1) + (amount > 2) >= 2",
+    "-(amount > 1) < 0",
+    "+(not amount) > 0",
+    "True * amount > 1",
+    "(amount or 5) > 1",
+])
+def test_expression_rejects_arithmetic_on_conditions(source):
+    """Tests that conditions can only be combined with and/or/not, where both evaluation paths agree."""
+    with pytest.raises(ValueError):
+        compile_expression(source)
+
+@pytest.mark.parametrize("source, expected", [
+    ("not (10 <= amount < 100) and features.velocity_24h >= 2 or model_score > 0.9", [True, False, False, True, True]),
+    ("amount / features.velocity_24h > 40", [False, False, True, True, False]),
+    ("not (amount / features.velocity_24h > 40)", [True, True, False, False, True]),
+    ("amount > 100 or amount / features.velocity_24h < 1", [False, False, True, True, False]),
+    ("-amount < -100 and model_score == 0", [False, False, True, True, False]),
+])
+def test_batch_evaluation_matches_single_evaluation(source, expected):
+    """Tests that the NumPy mask agrees with per-transaction evaluation, including chained comparisons, not and division by zero."""
+    expression = compile_expression(source)
+    amounts = np.array([5.0, 50.0, 150.0, 150.0, 50.0])
+    velocities = np.array([3.0, 3.0, 1.0, 2.0, 0.0])
+    scores = np.array([0.0, 0.0, 0.0, 0.0, 0.95])
+
+    mask = expression.evaluate_batch({"amount": amounts, "model_score": scores, "features.velocity_24h": velocities})
+    single = [
+        expression.evaluate(Transaction(id=1, amount=a, isFraud=False, model_score=s, features={"velocity_24h": v}))
+        for a, v, s in zip(amounts, velocities, scores)
+    ]
+
+    assert mask.tolist() == single == expected
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services import AsOfFeatureIndex, FeatureStore
+
+@pytest.fixture
+def history():
+    return pd.DataFrame({
+        "CUSTOMER_ID": [2, 1, 1, 2, 1],
+        "TX_DATETIME": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-01", "2024-01-05", "2024-01-02"]),
+        "TX_AMOUNT": [20.0, 30.0, 10.0, 40.0, 15.0],
+        "CUSTOMER_ID_NB_TX_24H": [0, 1, 0, 0, 1],
+        "TX_FRAUD": [0, 1, 0, 0, 1],
+        "TERMINAL_ID": [7, 8, 7, 9, 8],
+    })
+
+def test_as_of_lookup_never_sees_the_future(history):
+    """Tests that a lookup returns the last transaction at or before the timestamp, never a later one."""
+    index = AsOfFeatureIndex.from_frame(history)
+
+    assert index.locate(1, "2023-12-31") == -1
+    assert index.values[index.locate(1, "2024-01-02 12:00"), index.columns.index("TX_AMOUNT")] == 15.0
+    assert index.values[index.locate(1, "2024-02-01"), index.columns.index("TX_AMOUNT")] == 30.0
+    assert index.locate(3, "2024-02-01") == -1
+
+def test_replaying_a_stored_transaction_returns_its_own_features(history):
+    """Tests that a backtest looking up a transaction at its own time gets the vector the model trained on."""
+    index = AsOfFeatureIndex.from_frame(history)
+    row = index.values[index.locate(1, "2024-01-03")]
+
+    # The row's aggregates were computed with shift(1), so they exclude the transaction itself
+    assert row.tolist() == [30.0, 1.0]
+
+def test_as_of_index_leaves_out_labels_and_identifiers(history):
+    """Tests that the previous transaction's fraud label is never returned as a feature."""
+    index = AsOfFeatureIndex.from_frame(history)
+
+    assert index.columns == ["TX_AMOUNT", "CUSTOMER_ID_NB_TX_24H"]
+
+def test_bulk_lookup_matches_single_lookups(history):
+    """Tests that the vectorised lookup agrees with the scalar one, including misses."""
+    index = AsOfFeatureIndex.from_frame(history)
+    customers = [1, 2, 1, 3, 2, 1]
+    timestamps = pd.to_datetime(["2023-12-31", "2024-01-04", "2024-01-02", "2024-01-04", "2024-01-01 23:59:59", "2024-01-10"], format="ISO8601")
+
+    expected = [index.locate(c, t) for c, t in zip(customers, timestamps)]
+
+    assert index.locate_bulk(customers, timestamps).tolist() == expected
+
+def test_feature_store_bulk_as_of(history):
+    """Tests that the bulk feature store lookup keeps input order and fills misses with NaN."""
+    FeatureStore._asof_index = AsOfFeatureIndex.from_frame(history)
+    try:
+        features = FeatureStore.get_features_as_of_bulk([2, 3], pd.to_datetime(["2024-01-06", "2024-01-06"]))
+        single = FeatureStore.get_features_as_of(1, "2024-01-02")
+    finally:
+        FeatureStore._asof_index = None
+
+    assert features.loc[0, "TX_AMOUNT"] == 40.0
+    assert np.isnan(features.loc[1, "TX_AMOUNT"])
+    assert single["TX_AMOUNT"] == 15.0
+
+def test_as_of_index_is_built_on_first_lookup(history, tmp_path):
+    """Tests that loading the store leaves the index unbuilt until a point-in-time lookup needs it."""
+    history.to_parquet(tmp_path / "feature_store.parquet", index=False)
+    FeatureStore._store_path = str(tmp_path / "feature_store.parquet")
+    try:
+        assert FeatureStore._asof_index is None
+        assert FeatureStore.get_features_as_of(2, "2024-01-02")["TX_AMOUNT"] == 20.0
+        assert FeatureStore._asof_index is not None
+    finally:
+        FeatureStore._asof_index = None
+        FeatureStore._store_path = None
@@ -0,0 +1,84 @@
+import pytest
+from app import lists
+from app.lists import ListStore, MembershipIndex, build_membership_index
+from app.schemas import Node, Transaction
+from app.logic._rules import list_membership
+
+def test_membership_index_has_no_false_negatives(tmp_path):
+    """Tests that every listed entry is found and that ints and strings of the same value match."""
+    version_dir = build_membership_index(range(0, 20000, 2), tmp_path, "blocked_customers", version="v1")
+    index = MembershipIndex(version_dir)
+
+    assert len(index) == 10000
+    assert all(index.contains(i) for i in range(0, 20000, 2))
+    assert index.contains("42")
+    # Misses are confirmed against the sorted keys, so Bloom false positives never leak through
+    assert not any(index.contains(i) for i in range(1, 20000, 2))
+
+def test_list_store_picks_up_a_new_version(tmp_path, monkeypatch):
+    """Tests that publishing a new version swaps it in on the next refresh without a reload."""
+    build_membership_index(["card-a"], tmp_path, "blocked_cards", version="v1")
+    ListStore.load_lists(tmp_path)
+    assert ListStore.get("blocked_cards").contains("card-a")
+
+    build_membership_index(["card-b"], tmp_path, "blocked_cards", version="v2")
+    monkeypatch.setattr(lists, "RELOAD_INTERVAL_SECONDS", 0.0)
+    index = ListStore.get("blocked_cards")
+
+    assert index.version == "v2"
+    assert index.contains("card-b") and not index.contains("card-a")
+
+def test_list_membership_node(tmp_path):
+    """Tests the node on the customer ID, on the transaction's terminal and on a key from its features."""
+    build_membership_index([123], tmp_path, "blocked_customers", version="v1")
+    build_membership_index([9], tmp_path, "blocked_terminals", version="v1")
+    build_membership_index(["fp-1"], tmp_path, "blocked_cards", version="v1")
+    ListStore.load_lists(tmp_path)
+    transaction = Transaction(id=123, amount=10, isFraud=False, terminal_id=9, features={"card_fingerprint": "fp-2"})
+
+    customer_node = Node(id="1", type="Rule", data={"list": "blocked_customers"}, position={"x":0, "y":0})
+    terminal_node = Node(id="2", type="Rule", data={"list": "blocked_terminals", "field": "terminal_id"}, position={"x":0, "y":0})
+    card_node = Node(id="3", type="Rule", data={"list": "blocked_cards", "field": "card_fingerprint"}, position={"x":0, "y":0})
+
+    assert list_membership(customer_node, transaction)[0] == 'true'
+    assert list_membership(terminal_node, transaction)[0] == 'true'
+    assert list_membership(card_node, transaction)[0] == 'false'
+    assert list_membership(terminal_node, transaction.model_copy(update={"terminal_id": 8}))[0] == 'false'
+
+    # A key the transaction does not carry is an error, not a silent miss
+    with pytest.raises(ValueError):
+        list_membership(card_node, Transaction(id=123, amount=10, isFraud=False))
+
+    unknown_node = Node(id="4", type="Rule", data={"list": "missing"}, position={"x":0, "y":0})
+    with pytest.raises(ValueError):
+        list_membership(unknown_node, transaction)
+
+@pytest.mark.parametrize("name", ["../lists", "a/b", "", "..", "name with spaces"])
+def test_list_names_are_validated(tmp_path, name):
+    """Tests that list names cannot reach outside the list directory."""
+    ListStore.load_lists(tmp_path)
+    with pytest.raises(ValueError):
+        ListStore.get(name)
+    with pytest.raises(ValueError):
+        build_membership_index([1], tmp_path, name)
+
+def test_unknown_lists_are_cached_as_missing(tmp_path, monkeypatch, mocker):
+    """Tests that unknown names are not looked up on disk again until the reload interval, and are bounded."""
+    ListStore.load_lists(tmp_path)
+    refresh = mocker.spy(ListStore, "_refresh")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            ListStore.get("not_published")
+    assert refresh.call_count == 1
+
+    # Published later, it is found after the interval
+    build_membership_index([1], tmp_path, "not_published", version="v1")
+    monkeypatch.setattr(lists, "RELOAD_INTERVAL_SECONDS", 0.0)
+    assert ListStore.get("not_published").contains(1)
+
+    monkeypatch.setattr(lists, "MAX_MISSING_LISTS", 3)
+    for i in range(10):
+        with pytest.raises(ValueError):
+            ListStore.get(f"unknown_{i}")
+    assert list(ListStore._missing) == ["unknown_7", "unknown_8", "unknown_9"]
@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import pytest
+from httpx import ASGITransport
+from app.main import app
+from loadtest.load_generator import BATCH_ENDPOINT, EXECUTE_ENDPOINT, PROFILES_ENDPOINT, TRANSACTION_PREFETCH, LatencyRecorder, run_load_test
+
+def test_latency_recorder_buckets_and_percentiles():
+    """Tests that requests land in the interval they started in and that percentiles are per interval."""
+    recorder = LatencyRecorder(interval=1.0)
+    for latency in range(1, 101):
+        recorder.record(BATCH_ENDPOINT, recorder.started + 0.5, float(latency), ok=True)
+    recorder.record(BATCH_ENDPOINT, recorder.started + 1.5, 500.0, ok=False)
+
+    first, second = recorder.interval_report(0)[BATCH_ENDPOINT], recorder.interval_report(1)[BATCH_ENDPOINT]
+    assert first["requests"] == 100 and first["error_rate"] == 0.0
+    assert first["p50_ms"] == pytest.approx(50.5)
+    assert first["p99_ms"] == pytest.approx(99.01)
+    assert first["max_ms"] == 100.0
+    assert (second["requests"], second["error_rate"], second["p50_ms"]) == (1, 1.0, 500.0)
+
+    summary = recorder.summary(duration=2.0)[BATCH_ENDPOINT]
+    assert summary["requests"] == 101
+    assert summary["throughput_rps"] == pytest.approx(50.5)
+
+@pytest.mark.parametrize("mode", ["closed", "open"])
+def test_simulation_loop_against_the_app(loaded_feature_store, fake_model, mode):
+    """Tests a short run in-process, replaying the frontend's batch, bulk profile and execute requests."""
+    args = argparse.Namespace(
+        base_url="http://test", mode=mode, users=2, think_time=0.0, rate=200.0, max_in_flight=10,
+        duration=0.5, interval=0.25, timeout=5.0, seed=1,
+    )
+
+    report = asyncio.run(run_load_test(args, transport=ASGITransport(app=app)))
+
+    summary = report["summary"]
+    assert set(summary) == {BATCH_ENDPOINT, PROFILES_ENDPOINT, EXECUTE_ENDPOINT}
+    assert all(stats["error_rate"] == 0.0 for stats in summary.values())
+    # Each browser fetches one batch per TRANSACTION_PREFETCH executions (the last one partly used)...
+    assert summary[EXECUTE_ENDPOINT]["requests"] > TRANSACTION_PREFETCH
+    assert summary[BATCH_ENDPOINT]["requests"] <= summary[EXECUTE_ENDPOINT]["requests"] // TRANSACTION_PREFETCH + args.users
+    # ...and caches the two customers' profiles after its first bulk request
+    assert summary[PROFILES_ENDPOINT]["requests"] == args.users
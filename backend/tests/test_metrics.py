@@ -0,0 +1,38 @@
+from app.metrics import WindowedMetrics, TimeBucketRing
+
+def test_window_confusion_matrix():
+    """Tests that every outcome, including REVIEW and true negatives, is counted."""
+    metrics = WindowedMetrics({"1m": (60, 1)})
+    metrics.record("BLOCK", True, 0.95, now=1000)
+    metrics.record("BLOCK", False, 0.81, now=1001)
+    metrics.record("APPROVE", False, 0.02, now=1002)
+    metrics.record("APPROVE", True, now=1003)
+    metrics.record("REVIEW", True, now=1004)
+
+    snapshot = metrics.snapshot("1m", now=1005)
+
+    assert snapshot["total"] == 5
+    assert snapshot["confusion_matrix"]["true_negatives"] == 1
+    assert snapshot["confusion_matrix"]["review_fraud"] == 1
+    assert snapshot["precision"] == 0.5
+    assert snapshot["review_rate"] == 0.2
+    assert snapshot["scored"] == 3
+    assert snapshot["score_histogram"][9] == 1
+
+def test_window_expires_old_buckets():
+    """Tests that decisions older than the window no longer contribute."""
+    metrics = WindowedMetrics({"1m": (60, 1), "1h": (3600, 60)})
+    metrics.record("BLOCK", True, now=1000)
+    metrics.record("BLOCK", False, now=1050)
+
+    assert metrics.snapshot("1m", now=1065)["total"] == 1
+    assert metrics.snapshot("1h", now=1065)["total"] == 2
+    assert metrics.snapshot("1m", now=5000)["total"] == 0
+
+def test_ring_ignores_late_events():
+    """Tests that an event older than the window does not corrupt a reused bucket."""
+    ring = TimeBucketRing(10, 1, width=1)
+    ring.add(100, 0)
+    ring.add(85, 0)
+
+    assert ring.totals(100)[0] == 1
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from ml_pipeline.models import model_tuner_xgboost as tuner
+from ml_pipeline.models.model_tuner_xgboost import BASELINE_PARAMS, BASELINE_ROUNDS, PARAM_SPACE, make_temporal_folds, sample_trials
+
+def test_temporal_folds_roll_forward_and_end_on_the_last_day():
+    """Tests that folds are contiguous validation windows behind a gap, the last ending on the last day."""
+    assert make_temporal_folds(60, n_folds=3, valid_days=7, gap_days=7) == [
+        (32, 39, 46),
+        (39, 46, 53),
+        (46, 53, 60),
+    ]
+
+def test_temporal_folds_need_training_days():
+    """Tests that a fold without any training days before its gap is rejected."""
+    assert make_temporal_folds(22, n_folds=1, valid_days=7, gap_days=14) == [(1, 15, 22)]
+    with pytest.raises(ValueError):
+        make_temporal_folds(21, n_folds=1, valid_days=7, gap_days=14)
+    with pytest.raises(ValueError):
+        make_temporal_folds(28, n_folds=3, valid_days=7, gap_days=7)
+
+def test_sample_trials_start_with_the_baseline_and_are_unique():
+    """Tests that the baseline comes first, trials are distinct and drawn from the search space."""
+    trials = sample_trials(25, seed=3)
+
+    assert len(trials) == 25
+    assert trials[0] == BASELINE_PARAMS
+    assert len({tuple(sorted(params.items())) for params in trials}) == 25
+    for params in trials[1:]:
+        assert all(params[name] in values for name, values in PARAM_SPACE.items())
+
+def test_sample_trials_are_deterministic_per_seed():
+    """Tests that a seed reproduces the same sweep, so cached fold results can be reused."""
+    assert sample_trials(10, seed=1) == sample_trials(10, seed=1)
+    assert sample_trials(10, seed=1) != sample_trials(10, seed=2)
+
+def test_baseline_trains_a_fixed_number_of_rounds(tmp_path, monkeypatch):
+    """Tests that the baseline is scored after exactly its fixed rounds, without early stopping."""
+    rng = np.random.default_rng(0)
+    n_rows = 2_000
+    X = rng.normal(size=(n_rows, len(tuner.FEATURES))).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=2.0, size=n_rows) > 2.5).astype(np.int8)
+    np.save(tmp_path / "X.npy", X)
+    np.save(tmp_path / "y.npy", y)
+    np.save(tmp_path / "days.npy", np.repeat(np.arange(20), n_rows // 20))
+    monkeypatch.setattr(tuner, "_fold_matrices", {})
+    tuner.quantize_feature_matrix(str(tmp_path), "fingerprint", cut_days=20, max_bin=32)
+    tuner._init_worker(str(tmp_path))
+    settings = {"max_bin": 32, "nthread": 1, "max_rounds": 1000, "early_stopping_rounds": 1}
+
+    result = tuner.evaluate_fold(BASELINE_PARAMS, (10, 12, 20), settings, fixed_rounds=BASELINE_ROUNDS)
+
+    assert result["best_iteration"] == BASELINE_ROUNDS - 1
+    assert 0.0 <= result["aucpr"] <= 1.0
+
+def test_quantized_matrix_keeps_order_and_missing_values(tmp_path):
+    """Tests that values are replaced by at most max_bin ordered bin codes fitted before the cut day, with NaN kept."""
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(1_000, len(tuner.FEATURES))).astype(np.float32)
+    X[:10, 1] = np.nan
+    X[-1, 0] = 100.0
+    np.save(tmp_path / "X.npy", X)
+    np.save(tmp_path / "days.npy", np.repeat(np.arange(10), 100))
+
+    tuner.quantize_feature_matrix(str(tmp_path), "fingerprint", cut_days=9, max_bin=16)
+    binned = np.load(tmp_path / "X_binned.npy")
+
+    assert binned.shape == X.shape
+    assert np.array_equal(np.isnan(binned), np.isnan(X))
+    for j in range(X.shape[1]):
+        present = ~np.isnan(X[:, j])
+        codes = binned[present, j]
+        assert len(np.unique(codes)) <= 16
+        order = np.argsort(X[present, j])
+        assert np.all(np.diff(codes[order]) >= 0)
+    # A value beyond every cut lands in the last bin
+    assert binned[-1, 0] == binned[:, 0].max()
@@ -109,6 +109,8 @@ const StrategyCanvas = () => {
           type: componentDetails.type,
           icon: componentDetails.icon,
           ...(componentDetails.type === 'Rule' && { value: 0, outputs: componentDetails.outputs }),
+          ...('expression' in componentDetails && { expression: componentDetails.expression }),
+          ...('list' in componentDetails && { list: componentDetails.list, field: componentDetails.field }),
       };
 
       const newNode: Node = {
@@ -7,6 +7,9 @@ import { Transaction } from '@/lib/mockData';
 
 const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
 
+// Transactions fetched ahead of time; their profiles are loaded in one bulk request.
+const TRANSACTION_PREFETCH = 20;
+
 const animateTrace = async (
   trace: ExecutionTrace,
   setActiveElements: (nodeId: string | null, edgeId: string | null) => void
@@ -39,9 +42,19 @@ const SimulationManager = () => {
   } = useCanvasStore();
 
   const isProcessingRef = useRef(false);
+  const upcomingTransactionsRef = useRef<Transaction[]>([]);
 
   useEffect(() => {
     let isCancelled = false;
+
+    const nextTransaction = async (): Promise<Transaction> => {
+      if (upcomingTransactionsRef.current.length === 0) {
+        const transactions = await api.getTransactionBatch(TRANSACTION_PREFETCH);
+        api.prefetchCustomerProfiles(transactions.map(transaction => transaction.id));
+        upcomingTransactionsRef.current = transactions;
+      }
+      return upcomingTransactionsRef.current.shift() as Transaction;
+    };
     
     const runApiLoop = async () => {
       if (simulationStatus !== 'running' || isProcessingRef.current || isCancelled) return;
@@ -50,7 +63,7 @@ const SimulationManager = () => {
       
       try {
         const blueprint = { nodes, edges };
-        const transaction: Transaction = await api.getNextTransaction();
+        const transaction: Transaction = await nextTransaction();
         setCurrentTransaction(transaction);
         
         const trace: ExecutionTrace = await api.executeStrategy(blueprint, transaction);
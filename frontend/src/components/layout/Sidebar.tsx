@@ -60,6 +60,27 @@ export const componentLibrary = [
           { id: 'false', name: '< Amount' }
         ]
       },
+      { 
+        type: 'Rule', 
+        label: 'Expression Rule', 
+        icon: CodeBracketIcon,
+        expression: 'amount > 500 and features.velocity_24h >= 5',
+        outputs: [
+          { id: 'true', name: 'Match' },
+          { id: 'false', name: 'No Match' }
+        ]
+      },
+      { 
+        type: 'Rule', 
+        label: 'List Membership', 
+        icon: ScaleIcon,
+        list: 'blocked_customers',
+        field: 'customer_id',
+        outputs: [
+          { id: 'true', name: 'Listed' },
+          { id: 'false', name: 'Not Listed' }
+        ]
+      },
       { type: 'Logic', label: 'AND Gate', icon: CodeBracketIcon },
       { type: 'Logic', label: 'OR Gate', icon: CodeBracketIcon },
     ]
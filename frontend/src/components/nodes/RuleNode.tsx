@@ -14,6 +14,9 @@ type RuleNodeData = {
   label: string;
   icon: React.ElementType;
   value: number;
+  expression?: string;
+  list?: string;
+  field?: string;
   outputs?: { id: string; name: string }[];
 };
 
@@ -34,6 +37,14 @@ const RuleNode = ({ id, data, selected }: NodeProps<RuleNodeData>) => {
     updateNodeData(id, { value: isNaN(newValue) ? 0 : newValue });
   };
 
+  const onExpressionChange = (e: React.ChangeEvent<HTMLTextAreaElement>) => {
+    updateNodeData(id, { expression: e.target.value });
+  };
+
+  const onListChange = (e: React.ChangeEvent<HTMLInputElement | HTMLSelectElement>) => {
+    updateNodeData(id, { [e.target.name]: e.target.value });
+  };
+
   const handleDelete = (e: React.MouseEvent) => {
     e.stopPropagation();
     deleteNodeAndEdges(id);
@@ -90,13 +101,49 @@ const RuleNode = ({ id, data, selected }: NodeProps<RuleNodeData>) => {
       )}
 
       <div className="p-3 bg-gray-50">
-        <label className="text-xs text-gray-500 block mb-1">Parameter Value</label>
-        <input
-          type="number"
-          defaultValue={data.value}
-          onChange={onValueChange}
-          className="w-full p-1 rounded-md border border-gray-300 text-sm"
-        />
+        {data.list !== undefined ? (
+          <>
+            <label className="text-xs text-gray-500 block mb-1">List</label>
+            <input
+              name="list"
+              type="text"
+              defaultValue={data.list}
+              onChange={onListChange}
+              className="nodrag w-full p-1 rounded-md border border-gray-300 text-sm mb-2"
+            />
+            <label className="text-xs text-gray-500 block mb-1">Match On</label>
+            <select
+              name="field"
+              defaultValue={data.field}
+              onChange={onListChange}
+              className="nodrag w-full p-1 rounded-md border border-gray-300 text-sm"
+            >
+              <option value="customer_id">Customer ID</option>
+              <option value="terminal_id">Terminal ID</option>
+            </select>
+          </>
+        ) : data.expression !== undefined ? (
+          <>
+            <label className="text-xs text-gray-500 block mb-1">Expression</label>
+            <textarea
+              defaultValue={data.expression}
+              onChange={onExpressionChange}
+              rows={3}
+              spellCheck={false}
+              className="nodrag w-full p-1 rounded-md border border-gray-300 text-xs font-mono"
+            />
+          </>
+        ) : (
+          <>
+            <label className="text-xs text-gray-500 block mb-1">Parameter Value</label>
+            <input
+              type="number"
+              defaultValue={data.value}
+              onChange={onValueChange}
+              className="w-full p-1 rounded-md border border-gray-300 text-sm"
+            />
+          </>
+        )}
       </div>
 
       <div className="relative border-t border-gray-200 bg-gray-50/50" style={{ height: `${(data.outputs?.length || 0) * 28}px`, padding: '8px 0' }}>
@@ -1,8 +1,10 @@
 export interface Transaction {
-    id: number;
+    id: number; // the customer ID
+    transaction_id?: number | null;
     amount: number;
     isFraud: boolean;
     model_score?: number;
+    terminal_id?: number | null;
     // We can add more features like z_score, velocity etc...
 }
 
@@ -15,6 +15,8 @@ export const nodeInfo: { [key: string]: string } = {
     'Amount Gate': 'A simple rule that branches the flow based on the transaction amount. It checks if the amount is greater than or equal to its parameter value.',
     'Threshold Gate': 'Converts a probabilistic model score into a binary decision. It checks if the incoming score is greater than or equal to its parameter value (the risk threshold).',
     'AND Gate': 'Logical AND. Continues the flow only if all incoming paths are TRUE.',
+    'Expression Rule': 'A custom condition written as an expression, e.g. "amount > 500 and features.velocity_24h >= 5 or model_score > 0.8". Supports comparisons, arithmetic, and/or/not on amount, model_score and features.<name>.',
+    'List Membership': 'Checks whether the transaction appears on a published blocklist or allowlist, by customer ID or terminal ID. Fails if the transaction does not carry the chosen key.',
     'OR Gate': 'Logical OR. Continues the flow if at least one incoming path is TRUE.',
 
     // Actions
@@ -24,6 +24,75 @@ export interface ProfileData {
     typicalCategories: string[];
 }
 
+export interface ProfileBatch {
+    profiles: ProfileData[];
+    missing: number[];
+    version: string;
+}
+
+type ProfileWaiter = { resolve: (profile: ProfileData) => void, reject: (error: Error) => void };
+
+// Profile lookups issued within this window are coalesced into one bulk request.
+const PROFILE_BATCH_DELAY_MS = 25;
+// Least recently used profiles are evicted beyond this many entries.
+const MAX_CACHED_PROFILES = 1000;
+// Profiles are cached for one feature store version; a new version clears the cache.
+const profileCache = new Map<number, ProfileData>();
+let profileCacheVersion: string | null = null;
+let pendingProfiles = new Map<number, ProfileWaiter[]>();
+let profileFlushTimer: ReturnType<typeof setTimeout> | null = null;
+
+const unknownProfile = (customerId: number): ProfileData => ({
+    name: `Unknown User #${customerId}`, customerId: String(customerId),
+    avgTransaction: 0, activityLevel: 0, typicalCategories: ["N/A"]
+});
+
+const getCachedProfile = (customerId: number): ProfileData | undefined => {
+  const profile = profileCache.get(customerId);
+  if (profile) {
+      // Re-insert so Map iteration order tracks recency
+      profileCache.delete(customerId);
+      profileCache.set(customerId, profile);
+  }
+  return profile;
+};
+
+const cacheProfiles = ({ profiles, version }: ProfileBatch) => {
+  if (version !== profileCacheVersion) {
+      profileCache.clear();
+      profileCacheVersion = version;
+  }
+  for (const profile of profiles) {
+      profileCache.delete(Number(profile.customerId));
+      profileCache.set(Number(profile.customerId), profile);
+  }
+  while (profileCache.size > MAX_CACHED_PROFILES) {
+      profileCache.delete(profileCache.keys().next().value as number);
+  }
+};
+
+const flushProfileRequests = async () => {
+  const batch = pendingProfiles;
+  pendingProfiles = new Map();
+  profileFlushTimer = null;
+
+  try {
+    const profileBatch = await api.getCustomerProfiles(Array.from(batch.keys()));
+    cacheProfiles(profileBatch);
+    // Missing customers are not cached, so they are looked up again once the feature store changes
+    for (const customerId of profileBatch.missing) {
+        console.warn(`Profile not found for customer ${customerId}. Returning default.`);
+    }
+    const found = new Map(profileBatch.profiles.map(profile => [Number(profile.customerId), profile]));
+    batch.forEach((waiters, customerId) => {
+        const profile = found.get(customerId) ?? unknownProfile(customerId);
+        waiters.forEach(({ resolve }) => resolve(profile));
+    });
+  } catch (error) {
+    batch.forEach(waiters => waiters.forEach(({ reject }) => reject(error as Error)));
+  }
+};
+
 export const api = {
   executeStrategy: async (blueprint: StrategyBlueprint, transaction: Transaction): Promise<ExecutionTrace> => {
     const response = await fetch(`${API_BASE_URL}/strategy/execute`, {
@@ -48,22 +117,49 @@ export const api = {
     }
     return response.json();
   },
+
+  getTransactionBatch: async (size: number): Promise<Transaction[]> => {
+    const response = await fetch(`${API_BASE_URL}/transactions/batch?size=${size}`);
+    if (!response.ok) {
+      throw new Error('Failed to fetch transactions from backend.');
+    }
+    return response.json();
+  },
   
-  getCustomerProfile: async (customerId: number): Promise<ProfileData> => {
-    const response = await fetch(`${API_BASE_URL}/profiles/${customerId}`);
+  getCustomerProfiles: async (customerIds: number[]): Promise<ProfileBatch> => {
+    const ids = Array.from(new Set(customerIds)).sort((a, b) => a - b);
+    // The backend answers with an ETag tied to the feature store version, so repeat
+    // lookups are served from the browser cache or revalidated with a 304.
+    const response = await fetch(`${API_BASE_URL}/profiles?ids=${ids.join(',')}`);
     if (!response.ok) {
-        if (response.status === 404) {
-            console.warn(`Profile not found for customer ${customerId}. Returning default.`);
-            return {
-                name: `Unknown User #${customerId}`, customerId: String(customerId),
-                avgTransaction: 0, activityLevel: 0, typicalCategories: ["N/A"]
-            };
-        }
-        throw new Error(`Failed to fetch profile for customer ${customerId}`);
+        throw new Error(`Failed to fetch profiles for customers ${ids.join(', ')}`);
     }
     return response.json();
   },
 
+  // Loads the profiles of upcoming transactions in one bulk request, ahead of display.
+  // Queued like any other lookup, so every ID lands in the same batch window.
+  prefetchCustomerProfiles: (customerIds: number[]): void => {
+    new Set(customerIds).forEach(customerId => {
+        api.getCustomerProfile(customerId).catch(error => console.error("Failed to prefetch profile:", error));
+    });
+  },
+
+  getCustomerProfile: (customerId: number): Promise<ProfileData> => {
+    const cached = getCachedProfile(customerId);
+    if (cached) {
+        return Promise.resolve(cached);
+    }
+    return new Promise((resolve, reject) => {
+        const waiters = pendingProfiles.get(customerId) ?? [];
+        waiters.push({ resolve, reject });
+        pendingProfiles.set(customerId, waiters);
+        if (!profileFlushTimer) {
+            profileFlushTimer = setTimeout(flushProfileRequests, PROFILE_BATCH_DELAY_MS);
+        }
+    });
+  },
+
   resetSimulation: async (): Promise<void> => {
     try {
         const response = await fetch(`${API_BASE_URL}/simulation/reset`, { method: 'POST' });